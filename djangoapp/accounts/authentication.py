@@ -0,0 +1,39 @@
+from django.core import signing
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from accounts import tokens
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authorization: Bearer <token> の署名付きトークンで認証する
+
+    署名と期限はDBを使わずに検証し、ユーザーは tokens.user_cache から取得するので、
+    キャッシュが有効な間はセッションもユーザーもDBから読まない。
+    """
+
+    keyword = b"bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+
+        try:
+            payload = tokens.parse_token(auth[1].decode("ascii"))
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        except (signing.BadSignature, UnicodeDecodeError):
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        user = tokens.get_user(payload.user_id, payload.version)
+        if user is None:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        # request.auth は TokenPayload (トークンの更新で発行時刻を引き継ぐ)
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
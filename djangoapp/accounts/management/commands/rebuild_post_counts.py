@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "ユーザーの投稿数と最終公開日時のカウンターを投稿から集計し直す"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="1回のUPDATEで更新するユーザー数 (ロックを短くするため)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        pks = list(CustomUser.objects.order_by("pk").values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            updated += CustomUser.objects.filter(
+                pk__gte=batch[0], pk__lte=batch[-1]
+            ).rebuild_post_counts()
+        self.stdout.write(f"Rebuilt post counts for {updated} users.")
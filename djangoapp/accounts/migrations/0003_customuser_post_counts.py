@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:03
+
+from django.db import migrations, models
+
+from accounts.models import post_count_expressions
+
+
+def rebuild_post_counts(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Post = apps.get_model('blog', 'Post')
+    CustomUser.objects.using(schema_editor.connection.alias).update(
+        **post_count_expressions(Post)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_customuser_options_alter_customuser_managers'),
+        ('blog', '0006_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='draft_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(rebuild_post_counts, migrations.RunPython.noop),
+    ]
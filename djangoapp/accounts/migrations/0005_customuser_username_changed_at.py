@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='username_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,10 +1,154 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, router
+from django.db.models import Count, IntegerField, Max, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def post_count_expressions(post_model):
+    """
+    ユーザーごとの投稿数と最終公開日時を集計する相関サブクエリ
+
+    rebuild_post_counts とマイグレーションでのバックフィルで使う。
+    """
+    posts = post_model.objects.filter(author=OuterRef("pk")).order_by().values("author")
+    published = posts.filter(is_published=True)
+    return {
+        "published_post_count": Coalesce(
+            Subquery(published.annotate(count=Count("pk")).values("count")),
+            0,
+            output_field=IntegerField(),
+        ),
+        "draft_post_count": Coalesce(
+            Subquery(
+                posts.filter(is_published=False)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+            output_field=IntegerField(),
+        ),
+        "last_published_at": Subquery(
+            published.annotate(last=Max("published_at")).values("last")
+        ),
+    }
+
+
+class CustomUserQuerySet(models.QuerySet):
+    def with_blog_posts(self, limit):
+        """
+        投稿数と最新limit件の投稿IDを、ユーザー一覧とまとめて取得する
+
+        投稿数は非正規化したカウンターを使い、最新の投稿は1本のprefetchクエリで
+        ユーザーごとにlimit件まで取得するため、投稿の多いユーザーがいても
+        クエリ数とメモリ使用量が増えない。
+        """
+        post_model = self.model._meta.get_field("blog_posts").related_model
+        latest_posts = post_model.objects.only("id", "author_id").order_by(
+            "-created_at", "-id"
+        )[:limit]
+        return self.prefetch_related(
+            Prefetch("blog_posts", queryset=latest_posts, to_attr="latest_blog_posts")
+        )
+
+    def rebuild_post_counts(self):
+        """
+        投稿数のカウンターを blog_post テーブルから集計し直す (更新した行数を返す)
+        """
+        post_model = self.model._meta.get_field("blog_posts").related_model
+        return self.update(**post_count_expressions(post_model))
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
 
 
 class CustomUser(AbstractUser):
+    # 投稿数と最終公開日時 (Post の保存・削除時に更新する非正規化カウンター)
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
+    draft_post_count = models.PositiveIntegerField(default=0, editable=False)
+    last_published_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # APIトークンに含める世代番号 (上げると発行済みのトークンがすべて無効になる)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+    # usernameを最後に変更した日時 (投稿のレスポンスの ETag / Last-Modified に含める)
+    username_changed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = CustomUserManager()
 
     class Meta:
         ordering = ["date_joined"]
 
+    # 読み込んだ時点のusername (投稿のレスポンスに含まれるため、変更を検出する)
+    _loaded_username = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get("username")
+        return instance
+
+    # set_password の後の保存で token_version を上げるか
+    _password_changed = False
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        revoke = (
+            self._password_changed
+            and not self._state.adding
+            and (update_fields is None or "password" in update_fields)
+        )
+        if revoke:
+            # ハッシュの更新 (update_fields=["password"]) でも確実にDBの値を上げる
+            self.token_version = models.F("token_version") + 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        if not self._state.adding and self.username_changed(update_fields):
+            self.username_changed_at = timezone.now()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"],
+                    "username_changed_at",
+                }
+        # post_save の受信側は _loaded_username を保存前の値として参照する
+        super().save(*args, **kwargs)
+        if update_fields is None or "username" in update_fields:
+            self._loaded_username = self.username
+        if update_fields is None or "password" in update_fields:
+            self._password_changed = False
+        if revoke:
+            self.refresh_from_db(
+                using=kwargs.get("using") or router.db_for_write(CustomUser),
+                fields=["token_version"],
+            )
+
+    def username_changed(self, update_fields=None):
+        """
+        保存でusernameが変わったか (読み込んでいないインスタンスは変わったとみなす)
+        """
+        if update_fields is not None and "username" not in update_fields:
+            return False
+        return self._loaded_username is None or self._loaded_username != self.username
+
+    @property
+    def blog_post_count(self):
+        return self.published_post_count + self.draft_post_count
+
+    def set_password(self, raw_password):
+        # セッションと同じく、パスワードを変更したら発行済みのトークンを無効にする
+        super().set_password(raw_password)
+        self._password_changed = True
+
+    def revoke_tokens(self):
+        """
+        発行済みのAPIトークンをすべて無効にする
+        """
+        CustomUser.objects.filter(pk=self.pk).update(
+            token_version=models.F("token_version") + 1
+        )
+        # レプリカの遅延で古い値を読まないよう、更新したDBから読み直す
+        self.refresh_from_db(
+            using=router.db_for_write(CustomUser), fields=["token_version"]
+        )
+
     def __str__(self):
         return str(self.username)
@@ -1,15 +1,46 @@
+from django.contrib.auth import authenticate
 from rest_framework import serializers
 
-from blog.models import Post
-
 from .models import CustomUser
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
-    blog_posts = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Post.objects.all()
-    )
+    # 一覧に含める最新投稿IDの上限
+    blog_posts_limit = 10
+
+    blog_post_count = serializers.IntegerField(read_only=True)
+    blog_posts = serializers.SerializerMethodField()
 
     class Meta:
         model = CustomUser
-        fields = ["id", "username", "blog_posts"]
+        fields = [
+            "id",
+            "username",
+            "blog_post_count",
+            "published_post_count",
+            "draft_post_count",
+            "last_published_at",
+            "blog_posts",
+        ]
+
+    def get_blog_posts(self, obj):
+        # CustomUserQuerySet.with_blog_posts でprefetchされた最新の投稿
+        return [post.pk for post in obj.latest_blog_posts]
+
+
+class TokenObtainSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    password = serializers.CharField(style={"input_type": "password"}, write_only=True)
+
+    def validate(self, attrs):
+        user = authenticate(
+            self.context.get("request"),
+            username=attrs["username"],
+            password=attrs["password"],
+        )
+        if user is None:
+            raise serializers.ValidationError(
+                "Unable to log in with provided credentials.", code="authorization"
+            )
+        attrs["user"] = user
+        return attrs
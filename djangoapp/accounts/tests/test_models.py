@@ -1,7 +1,11 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 
 from accounts.models import CustomUser
+from blog.models import Post
 
 
 @pytest.mark.django_db
@@ -50,3 +54,91 @@ class TestCustomUserModel:
         """__str__メソッドの動作を確認"""
         user = CustomUser.objects.create_user(username="testuser", password="password")
         assert str(user) == "testuser"
+
+
+@pytest.mark.django_db
+class TestPostCounters:
+    def setup_method(self):
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    def counters(self):
+        self.user.refresh_from_db()
+        return (
+            self.user.published_post_count,
+            self.user.draft_post_count,
+            self.user.last_published_at,
+        )
+
+    def test_counters_follow_post_save_and_delete(self):
+        """投稿の作成・公開・非公開・削除でカウンターが更新されることを確認"""
+        draft = Post.objects.create(title="Draft", content="Content", author=self.user)
+        assert self.counters() == (0, 1, None)
+
+        draft.is_published = True
+        draft.save()
+        assert self.counters() == (1, 0, draft.published_at)
+
+        newer = Post.objects.create(
+            title="Newer", content="Content", author=self.user, is_published=True
+        )
+        assert self.counters() == (2, 0, newer.published_at)
+
+        newer.delete()
+        assert self.counters() == (1, 0, draft.published_at)
+
+        Post.objects.filter(pk=draft.pk).delete()
+        assert self.counters() == (0, 0, None)
+
+    def test_changing_author_moves_counts(self):
+        other = CustomUser.objects.create_user(username="other", password="password")
+        post = Post.objects.create(
+            title="Post", content="Content", author=self.user, is_published=True
+        )
+        post = Post.objects.for_api().get(pk=post.pk)
+        post.author = other
+        post.save()
+
+        assert self.counters() == (0, 0, None)
+        other.refresh_from_db()
+        assert other.published_post_count == 1
+        assert other.last_published_at == post.published_at
+
+    def test_editing_post_does_not_update_counters(self, django_assert_num_queries):
+        post = Post.objects.create(title="Post", content="Content", author=self.user)
+        post = Post.objects.get(pk=post.pk)
+        post.title = "Updated"
+        with django_assert_num_queries(1):
+            post.save()
+
+    def test_rebuild_post_counts_command(self):
+        """カウンターがずれていても rebuild_post_counts で集計し直せることを確認"""
+        Post.objects.create(title="Draft", content="Content", author=self.user)
+        post = Post.objects.create(
+            title="Post", content="Content", author=self.user, is_published=True
+        )
+        CustomUser.objects.update(
+            published_post_count=5, draft_post_count=5, last_published_at=None
+        )
+
+        call_command("rebuild_post_counts", "--batch-size", "1", stdout=StringIO())
+
+        assert self.counters() == (1, 1, post.published_at)
+
+    def test_deleting_user_cascades_without_updating_counters(
+        self, django_assert_max_num_queries
+    ):
+        """ユーザーの削除では投稿ごとのカウンター更新を行わないことを確認"""
+        for i in range(5):
+            Post.objects.create(title=f"Post {i}", content="Content", author=self.user)
+
+        with django_assert_max_num_queries(10) as context:
+            self.user.delete()
+
+        assert not any(
+            query["sql"].startswith('UPDATE "accounts_customuser"')
+            for query in context.captured_queries
+        )
+
+        assert not Post.objects.exists()
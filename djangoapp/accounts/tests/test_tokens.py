@@ -0,0 +1,192 @@
+import pytest
+from django.conf import settings
+from django.core import signing
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import tokens
+from accounts.models import CustomUser
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestSignedTokenAuthentication:
+    def setup_method(self):
+        tokens.user_cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    def obtain_token(self):
+        response = self.client.post(
+            reverse("token-obtain"),
+            {"username": "testuser", "password": "password"},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        return response.json()["token"]  # type: ignore
+
+    def bearer(self, token):
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_obtain_token(self):
+        """ユーザー名とパスワードでトークンを発行し、投稿を作成できることを確認"""
+        token = self.obtain_token()
+
+        response = self.client.post(
+            reverse("post-list"),
+            {"title": "Post", "content": "Content"},
+            format="json",
+            **self.bearer(token),
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED  # type: ignore
+        assert response.json()["author"] == "testuser"  # type: ignore
+
+    def test_obtain_token_invalid_credentials(self):
+        response = self.client.post(
+            reverse("token-obtain"),
+            {"username": "testuser", "password": "wrong"},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # type: ignore
+
+    def test_cached_user_needs_no_queries(self, django_assert_num_queries):
+        """キャッシュが有効な間はセッションもユーザーもDBから読まないことを確認"""
+        token = self.obtain_token()
+        url = reverse("token-refresh")
+
+        with django_assert_num_queries(1):
+            self.client.post(url, **self.bearer(token))
+        with django_assert_num_queries(0):
+            response = self.client.post(url, **self.bearer(token))
+
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        payload = tokens.parse_token(response.json()["token"])  # type: ignore
+        assert payload[:2] == (self.user.pk, self.user.token_version)
+        assert payload.issued_at == tokens.parse_token(token).issued_at
+
+    def test_invalid_token(self):
+        token = self.obtain_token()
+
+        response = self.client.get(reverse("post-list"), **self.bearer(token + "x"))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN  # type: ignore
+        assert response.json()["detail"] == "Invalid token."  # type: ignore
+
+    def test_expired_token(self):
+        token = self.obtain_token()
+
+        with override_settings(TOKEN_TTL_SECONDS=-1):
+            with pytest.raises(signing.SignatureExpired):
+                tokens.parse_token(token)
+            response = self.client.post(reverse("token-refresh"), **self.bearer(token))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED  # type: ignore
+        assert response.json()["detail"] == "Token has expired."  # type: ignore
+
+    def test_refresh_past_max_lifetime(self):
+        """最初の発行から最大の有効期間を過ぎたトークンは更新できないことを確認"""
+        token = self.obtain_token()
+        url = reverse("token-refresh")
+
+        with override_settings(TOKEN_MAX_LIFETIME_SECONDS=60):
+            response = self.client.post(url, **self.bearer(token))
+            assert response.status_code == status.HTTP_200_OK  # type: ignore
+            refreshed = response.json()["token"]  # type: ignore
+
+        with override_settings(TOKEN_MAX_LIFETIME_SECONDS=-1):
+            response = self.client.post(url, **self.bearer(refreshed))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED  # type: ignore
+        detail = response.json()["detail"]  # type: ignore
+        assert detail == "Token can no longer be refreshed."
+
+    def test_token_without_issue_time_is_invalid(self):
+        token = signing.dumps({"u": self.user.pk, "v": 0}, salt=tokens.SALT)
+
+        response = self.client.post(reverse("token-refresh"), **self.bearer(token))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED  # type: ignore
+
+    def test_revoke(self):
+        """無効化すると、キャッシュにあるトークンも含めて使えなくなることを確認"""
+        token = self.obtain_token()
+        other = self.obtain_token()
+        self.client.post(reverse("token-refresh"), **self.bearer(other))
+
+        response = self.client.post(reverse("token-revoke"), **self.bearer(token))
+        assert response.status_code == status.HTTP_204_NO_CONTENT  # type: ignore
+
+        response = self.client.post(reverse("token-refresh"), **self.bearer(other))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED  # type: ignore
+
+        assert self.obtain_token() != token
+
+    def test_password_change_revokes(self):
+        token = self.obtain_token()
+
+        self.user.set_password("changed")
+        self.user.save()
+
+        response = self.client.post(reverse("token-refresh"), **self.bearer(token))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED  # type: ignore
+
+    def test_password_hash_upgrade(self):
+        """ハッシュの更新 (update_fields=["password"]) でもDBの token_version を上げ、
+        発行したトークンが使えることを確認"""
+        md5 = "django.contrib.auth.hashers.MD5PasswordHasher"
+        with override_settings(PASSWORD_HASHERS=[md5]):
+            self.user.set_password("password")
+            self.user.save()
+        old_version = CustomUser.objects.get(pk=self.user.pk).token_version
+
+        with override_settings(PASSWORD_HASHERS=[settings.PASSWORD_HASHERS[0], md5]):
+            token = self.obtain_token()
+
+        user = CustomUser.objects.get(pk=self.user.pk)
+        assert not user.password.startswith("md5$")
+        assert user.token_version == old_version + 1
+        response = self.client.post(reverse("token-refresh"), **self.bearer(token))
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+
+    def test_inactive_user(self):
+        token = self.obtain_token()
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.post(reverse("token-refresh"), **self.bearer(token))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED  # type: ignore
+
+    def test_async_view(self):
+        """非同期ビューでもトークンで認証できることを確認"""
+        token = self.obtain_token()
+        post = Post.objects.create(title="Draft", content="Content", author=self.user)
+        url = reverse("async-post-detail", args=[post.pk])
+
+        assert Client().get(url).status_code == status.HTTP_404_NOT_FOUND
+        response = Client().get(url, **self.bearer(token))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["title"] == "Draft"
+
+    def test_async_view_csrf(self):
+        """非同期ビューでもCSRFはセッションで認証した場合だけ確認することを確認"""
+        token = self.obtain_token()
+        url = reverse("async-post-list")
+        client = Client(enforce_csrf_checks=True)
+        data = {"title": "Post", "content": "Content"}
+
+        response = client.post(
+            url, data, content_type="application/json", **self.bearer(token)
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        client.force_login(self.user)
+        response = client.post(url, data, content_type="application/json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.json()["detail"].startswith("CSRF Failed")
@@ -0,0 +1,80 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from accounts.serializers import CustomUserSerializer
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestUserList:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = "/api/accounts/users/"
+
+    def test_user_list_is_paginated(self):
+        """ユーザー一覧がカーソルでページングされることを確認"""
+        for i in range(3):
+            CustomUser.objects.create_user(username=f"user{i}", password="password")
+
+        response = self.client.get(self.url, {"page_size": 2})
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        body = response.json()  # type: ignore
+        assert [user["username"] for user in body["results"]] == ["user0", "user1"]
+
+        response = self.client.get(body["next"])
+        body = response.json()  # type: ignore
+        assert [user["username"] for user in body["results"]] == ["user2"]
+        assert body["next"] is None
+
+    def test_blog_posts_are_capped_and_counted(self):
+        """blog_postsが最新の上限件数に制限され、投稿数が別に返ることを確認"""
+        user = CustomUser.objects.create_user(username="writer", password="password")
+        limit = CustomUserSerializer.blog_posts_limit
+        posts = [
+            Post.objects.create(title=f"Post {i}", content="Content", author=user)
+            for i in range(limit + 5)
+        ]
+
+        response = self.client.get(self.url)
+        result = response.json()["results"][0]  # type: ignore
+        assert result["blog_post_count"] == limit + 5
+        assert result["blog_posts"] == [post.pk for post in reversed(posts)][:limit]
+
+    def test_user_list_query_count_is_constant(self, django_assert_num_queries):
+        """ユーザー数・投稿数に関係なくクエリ数が一定であることを確認"""
+        for i in range(5):
+            user = CustomUser.objects.create_user(
+                username=f"user{i}", password="password"
+            )
+            for j in range(3):
+                Post.objects.create(title=f"Post {j}", content="Content", author=user)
+
+        with django_assert_num_queries(2):
+            response = self.client.get(self.url)
+        assert len(response.json()["results"]) == 5  # type: ignore
+
+
+@pytest.mark.django_db
+class TestUserDetail:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.url = f"/api/accounts/users/{self.user.pk}/"
+
+    def test_get_user_detail(self):
+        post = Post.objects.create(title="Post", content="Content", author=self.user)
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        assert response.json() == {  # type: ignore
+            "id": self.user.pk,
+            "username": "testuser",
+            "blog_post_count": 1,
+            "published_post_count": 0,
+            "draft_post_count": 1,
+            "last_published_at": None,
+            "blog_posts": [post.pk],
+        }
@@ -0,0 +1,151 @@
+"""
+APIの署名付きトークン
+
+トークンは (ユーザーid, token_version) を SECRET_KEY で署名したもので、
+DBにもセッションにも保存しない。発行から TOKEN_TTL_SECONDS を過ぎると無効になり、
+ユーザーの token_version を上げる (revoke_tokens、パスワードの変更) と
+それまでに発行したトークンがすべて無効になる。
+トークンの更新では最初の発行時刻を引き継ぎ、そこから TOKEN_MAX_LIFETIME_SECONDS を
+過ぎたトークンは更新できない (漏れたトークンを更新し続けて使えないようにする)。
+
+トークンからのユーザーの取得は (id, token_version) をキーにプロセス内で
+TOKEN_USER_CACHE_SECONDS の間キャッシュする。無効にしたプロセスでは
+すぐに、それ以外のプロセスでもこの秒数のうちに無効になる。
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from accounts.models import CustomUser
+
+SALT = "accounts.tokens"
+
+TokenPayload = namedtuple("TokenPayload", ["user_id", "version", "issued_at"])
+
+
+def get_ttl():
+    return getattr(settings, "TOKEN_TTL_SECONDS", 3600)
+
+
+def get_max_lifetime():
+    return getattr(settings, "TOKEN_MAX_LIFETIME_SECONDS", 7 * 24 * 3600)
+
+
+def issue_token(user, issued_at=None):
+    """
+    user のトークンと有効期限を返す
+
+    issued_at は最初に発行した時刻 (UNIX時間の秒)。更新では元のトークンの値を渡す。
+    """
+    if issued_at is None:
+        issued_at = int(time.time())
+    token = signing.dumps(
+        {"u": user.pk, "v": user.token_version, "i": issued_at}, salt=SALT
+    )
+    return {
+        "token": token,
+        "expires_at": timezone.now() + timedelta(seconds=get_ttl()),
+    }
+
+
+def parse_token(token):
+    """
+    トークンを TokenPayload (ユーザーid, token_version, 最初の発行時刻) にする
+
+    改ざんされている場合は signing.BadSignature、期限切れの場合は
+    signing.SignatureExpired (BadSignature のサブクラス) を送出する。
+    """
+    payload = signing.loads(token, salt=SALT, max_age=get_ttl())
+    try:
+        return TokenPayload(int(payload["u"]), int(payload["v"]), int(payload["i"]))
+    except (TypeError, KeyError, ValueError):
+        raise signing.BadSignature("Invalid token payload.")
+
+
+def refresh_token(user, payload):
+    """
+    最初の発行時刻を引き継いだ新しいトークンを返す
+
+    最初の発行から TOKEN_MAX_LIFETIME_SECONDS を過ぎていれば None を返す。
+    """
+    if time.time() - payload.issued_at > get_max_lifetime():
+        return None
+    return issue_token(user, issued_at=payload.issued_at)
+
+
+class UserCache:
+    """
+    (ユーザーid, token_version) をキーにしたプロセス内のユーザーのキャッシュ
+
+    件数が maxsize を超えたら最も古く使われたものから捨てる (LRU)。
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @property
+    def timeout(self):
+        return getattr(settings, "TOKEN_USER_CACHE_SECONDS", 15)
+
+    def get(self, pk, version):
+        key = (pk, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # リクエストごとに属性を変更されても他のリクエストに影響しないようにする
+        return copy.copy(user)
+
+    def set(self, user):
+        key = (user.pk, user.token_version)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, copy.copy(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, pk):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == pk]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def get_user(pk, version):
+    """
+    トークンのユーザーを返す (無効化されたトークンや無効なユーザーなら None)
+    """
+    user = user_cache.get(pk, version)
+    if user is None:
+        user = CustomUser.objects.filter(
+            pk=pk, token_version=version, is_active=True
+        ).first()
+        if user is None:
+            return None
+        user_cache.set(user)
+    return user
+
+
+def revoke_tokens(user):
+    user.revoke_tokens()
+    user_cache.invalidate(user.pk)
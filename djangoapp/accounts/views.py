@@ -1,14 +1,68 @@
-from rest_framework import generics
+from rest_framework import exceptions, generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from . import tokens
+from .authentication import SignedTokenAuthentication
 from .models import CustomUser
-from .serializers import CustomUserSerializer
+from .pagination import UserCursorPagination
+from .serializers import CustomUserSerializer, TokenObtainSerializer
 
 
 class UserList(generics.ListAPIView):
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.with_blog_posts(CustomUserSerializer.blog_posts_limit)
     serializer_class = CustomUserSerializer
+    pagination_class = UserCursorPagination
 
 
 class UserDetail(generics.RetrieveAPIView):
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.with_blog_posts(CustomUserSerializer.blog_posts_limit)
     serializer_class = CustomUserSerializer
+
+
+class TokenObtainView(APIView):
+    """
+    ユーザー名とパスワードでAPIトークンを発行する
+    """
+
+    authentication_classes = ()
+    permission_classes = ()
+    throttle_scope = "auth-token"
+
+    def post(self, request, *args, **kwargs):
+        serializer = TokenObtainSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(tokens.issue_token(serializer.validated_data["user"]))
+
+
+class TokenRefreshView(APIView):
+    """
+    有効なトークンと引き換えに、有効期限を延ばした新しいトークンを発行する
+
+    最初の発行から TOKEN_MAX_LIFETIME_SECONDS を過ぎたトークンは更新できない。
+    """
+
+    authentication_classes = (SignedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+    throttle_scope = "auth-token"
+
+    def post(self, request, *args, **kwargs):
+        token = tokens.refresh_token(request.user, request.auth)
+        if token is None:
+            raise exceptions.AuthenticationFailed("Token can no longer be refreshed.")
+        return Response(token)
+
+
+class TokenRevokeView(APIView):
+    """
+    ユーザーに発行済みのトークンをすべて無効にする
+    """
+
+    authentication_classes = (SignedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        tokens.revoke_tokens(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,194 @@
+"""
+大量データを投入したテスト用DBでAPIのレイテンシとスループットを計測するベンチマーク
+
+結果をJSONに保存し、--baseline を指定すると中央値 (p50) が
+--threshold を超えて悪化したシナリオがあれば終了コード1で失敗する。
+DATABASE_URL を指定しなければ config.settings のDB (PostgreSQL) のテスト用DBを使う。
+
+    DATABASE_URL=sqlite:///bench.sqlite3 python -m benchmarks.api --posts 100000
+    python -m benchmarks.api --baseline benchmarks/results/baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from accounts.models import CustomUser  # noqa: E402
+from benchmarks.factories import seed_posts, seed_users  # noqa: E402
+from blog.models import Post  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# レスポンスキャッシュとスロットルのカウンターを無効にする
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "throttle": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+def measure(name, requests, send):
+    """
+    send(i) を requests 回呼び出し、レイテンシの統計とスループットを返す
+    """
+    send(-1)  # ウォームアップ
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        request_started = time.perf_counter()
+        response = send(i)
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            raise SystemExit(f"{name}: status {response.status_code}")
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "rps": requests / elapsed,
+    }
+
+
+@contextmanager
+def seeded_database(posts, users, seed=0, keepdb=False):
+    """
+    テスト用DBを作成して投稿とユーザーを投入し、終了時に削除する
+
+    作成にかかった秒数を返す。
+    """
+    if connection.vendor == "sqlite" and keepdb:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        connection.settings_dict["TEST"]["NAME"] = str(RESULTS_DIR / "bench.sqlite3")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb
+    )
+    try:
+        started = time.perf_counter()
+        author_ids = seed_users(users)
+        seed_posts(posts, author_ids, seed=seed)
+        yield time.perf_counter() - started
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def run_scenarios(requests, seed):
+    rng = random.Random(seed)
+    client = Client()
+    author = CustomUser.objects.order_by("pk").first()
+    writer = Client()
+    writer.force_login(author)
+
+    post_ids = list(
+        Post.objects.filter(is_published=True).values_list("pk", flat=True)[:10000]
+    )
+    # 深いページ (1,000件目以降) のカーソルを取得しておく
+    # (next のURLにはカーソルと page_size が含まれるので、data を渡すと上書きされる)
+    deep_page = "/api/blog/posts/?page_size=100"
+    for _ in range(10):
+        deep_page = client.get(deep_page).json()["next"]
+
+    scenarios = {
+        "post_list": lambda i: client.get("/api/blog/posts/"),
+        "post_list_deep_page": lambda i: client.get(deep_page),
+        "post_detail": lambda i: client.get(f"/api/blog/posts/{rng.choice(post_ids)}"),
+        "post_create": lambda i: writer.post(
+            "/api/blog/posts/",
+            {"title": f"bench create {i}", "content": "本文", "is_published": True},
+            content_type="application/json",
+        ),
+        "user_list": lambda i: client.get("/api/accounts/users/"),
+    }
+    return {name: measure(name, requests, send) for name, send in scenarios.items()}
+
+
+def compare(results, baseline, threshold):
+    """
+    ベースラインより p50 が threshold (割合) を超えて遅くなったシナリオを返す
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"] - 1
+        if ratio > threshold:
+            regressions.append((name, base["p50_ms"], result["p50_ms"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "latest.json")
+    parser.add_argument("--baseline", type=Path, help="比較するベースラインのJSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument(
+        "--keepdb", action="store_true", help="テスト用DBとデータを次回も使い回す"
+    )
+    args = parser.parse_args(argv)
+
+    with seeded_database(args.posts, args.users, args.seed, args.keepdb) as seconds:
+        with override_settings(CACHES=NO_CACHE, ALLOWED_HOSTS=["*"]):
+            scenarios = run_scenarios(args.requests, args.seed)
+
+    results = {
+        "meta": {
+            "vendor": connection.vendor,
+            "posts": args.posts,
+            "users": args.users,
+            "seed_seconds": seconds,
+        },
+        "scenarios": scenarios,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+
+    print(f"{'scenario':<20} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8}")
+    for name, result in scenarios.items():
+        print(
+            f"{name:<20} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}"
+            f" {result['rps']:>8.1f}"
+        )
+    print(f"results saved to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, current, ratio in regressions:
+            print(
+                f"REGRESSION {name}: p50 {base:.2f}ms -> {current:.2f}ms (+{ratio:.0%})"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
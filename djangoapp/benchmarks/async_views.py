@@ -0,0 +1,101 @@
+"""
+同期 (DRF) と非同期の投稿一覧・詳細ビューの同時実行スループットを比較するベンチマーク
+
+ASGIハンドラー (AsyncClient) から同時に --concurrency 件ずつリクエストを送る。
+同期ビューはリクエストごとに sync_to_async でスレッドを経由する。
+レスポンスキャッシュは無効にして、毎回DBにアクセスさせる。
+
+    DATABASE_URL=postgres://... python -m benchmarks.async_views --seed 1000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import AsyncClient  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from accounts.models import CustomUser  # noqa: E402
+from blog.models import Post  # noqa: E402
+
+# レスポンスキャッシュとスロットルのカウンターを無効にする
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "throttle": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+PATHS = {
+    "list": ("/api/blog/posts/", "/api/blog/async/posts/"),
+    "detail": ("/api/blog/posts/{pk}", "/api/blog/async/posts/{pk}"),
+}
+
+
+def seed(count):
+    author, _ = CustomUser.objects.get_or_create(username="bench-author")
+    missing = count - Post.objects.filter(author=author).count()
+    Post.objects.bulk_create(
+        Post(
+            title=f"Bench {i}",
+            content="ベンチマーク用の投稿です。" * 20,
+            author=author,
+            is_published=True,
+        )
+        for i in range(max(missing, 0))
+    )
+
+
+async def run(path, requests, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            if response.status_code != 200:
+                raise SystemExit(f"{path} returned {response.status_code}")
+
+    await one()  # ウォームアップ
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--seed", type=int, default=0, help="事前に作成する投稿数")
+    args = parser.parse_args(argv)
+
+    if args.seed:
+        seed(args.seed)
+    pk = Post.objects.filter(is_published=True).values_list("pk", flat=True).first()
+    if pk is None:
+        raise SystemExit("No published posts. Run with --seed N.")
+
+    print(f"{'endpoint':<8} {'concurrency':>11} {'sync req/s':>12} {'async req/s':>12}")
+    with override_settings(CACHES=NO_CACHE, ALLOWED_HOSTS=["*"]):
+        for name, (sync_path, async_path) in PATHS.items():
+            for concurrency in args.concurrency:
+                sync_rps = asyncio.run(
+                    run(sync_path.format(pk=pk), args.requests, concurrency)
+                )
+                async_rps = asyncio.run(
+                    run(async_path.format(pk=pk), args.requests, concurrency)
+                )
+                print(
+                    f"{name:<8} {concurrency:>11} {sync_rps:>12.1f} {async_rps:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+投稿一覧エンドポイントのリクエスト/秒を、永続接続の有無で比較するベンチマーク
+
+WSGIハンドラーを直接呼び出すので、リクエストごとの close_old_connections
+(CONN_MAX_AGE による接続の切断) も本番と同じように動く。
+レスポンスキャッシュは無効にして、毎回DBにアクセスさせる。
+
+    DATABASE_URL=postgres://... python -m benchmarks.connection_reuse --requests 500
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+# レスポンスキャッシュとスロットルのカウンターを無効にする
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "throttle": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+def request(application, path):
+    environ = {"PATH_INFO": path, "wsgi.input": io.BytesIO()}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, headers: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        # request_finished が送られ、CONN_MAX_AGE に従って接続が閉じられる
+        response.close()
+    return statuses[0]
+
+
+def run(application, path, requests, conn_max_age):
+    connection = connections["default"]
+    connection.close()
+    connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+
+    request(application, path)  # ウォームアップ
+    started = time.perf_counter()
+    for _ in range(requests):
+        status = request(application, path)
+        if not status.startswith("200"):
+            raise SystemExit(f"{path} returned {status}")
+    elapsed = time.perf_counter() - started
+    return requests / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--path", default="/api/blog/posts/")
+    args = parser.parse_args(argv)
+
+    application = get_wsgi_application()
+    with override_settings(CACHES=NO_CACHE, ALLOWED_HOSTS=["*"]):
+        results = {
+            "CONN_MAX_AGE=0": run(application, args.path, args.requests, 0),
+            "CONN_MAX_AGE=60": run(application, args.path, args.requests, 60),
+        }
+
+    vendor = connections["default"].vendor
+    print(f"{args.path} ({vendor}, {args.requests} requests)")
+    for name, rps in results.items():
+        print(f"  {name:<16} {rps:10.1f} req/s")
+    speedup = results["CONN_MAX_AGE=60"] / results["CONN_MAX_AGE=0"]
+    print(f"  speedup          {speedup:10.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
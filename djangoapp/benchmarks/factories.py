@@ -0,0 +1,72 @@
+"""
+ベンチマーク用の大量データを bulk_create で高速に作成するファクトリ
+
+乱数のシードを固定しているので、同じ引数なら毎回同じデータになる。
+"""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from blog.models import Post
+
+USERNAME_PREFIX = "bench-user-"
+
+
+def seed_users(count, batch_size=2000):
+    """
+    count 人のユーザーを作成する (パスワードのハッシュは1回だけ計算して使い回す)
+    """
+    password = make_password("password")
+    base = timezone.now() - timedelta(days=365)
+    existing = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).count()
+    CustomUser.objects.bulk_create(
+        (
+            CustomUser(
+                username=f"{USERNAME_PREFIX}{i}",
+                password=password,
+                date_joined=base + timedelta(seconds=i),
+            )
+            for i in range(existing, count)
+        ),
+        batch_size=batch_size,
+    )
+    return list(
+        CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).values_list(
+            "pk", flat=True
+        )
+    )
+
+
+def seed_posts(count, author_ids, seed=0, published_ratio=0.8, batch_size=5000):
+    """
+    count 件の投稿を作成する
+
+    save() を通らないため、公開済みの投稿には published_at を直接設定して
+    本文を変換し、最後に投稿者のカウンターを集計し直す。
+    """
+    rng = random.Random(seed)
+    base = timezone.now() - timedelta(days=365)
+    existing = Post.objects.count()
+    created = existing
+    while created < count:
+        batch = []
+        for i in range(created, min(created + batch_size, count)):
+            is_published = rng.random() < published_ratio
+            batch.append(
+                Post(
+                    title=f"ベンチマーク投稿 {i}",
+                    content="本文のサンプルです。" * rng.randint(5, 200),
+                    author_id=rng.choice(author_ids),
+                    is_published=is_published,
+                    published_at=base + timedelta(seconds=i) if is_published else None,
+                )
+            )
+            batch[-1].set_rendered_content()
+        Post.objects.bulk_create(batch)
+        created += len(batch)
+    CustomUser.objects.filter(pk__in=author_ids).rebuild_post_counts()
+    return created - existing
@@ -0,0 +1,89 @@
+"""
+投稿一覧 (PostListView) のJSON出力を、DRF標準の JSONRenderer と ORJSONRenderer で比較するベンチマーク
+
+どちらもシリアライザで datetime を文字列にし (DRFの既定の形式)、
+json.dumps と orjson のレンダリングの違いだけを比較する。
+シリアライズ+レンダリングだけの時間と、ビュー全体のリクエスト/秒を計測する。
+
+    DATABASE_URL=sqlite:///bench.sqlite3 python -m benchmarks.renderers --posts 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from rest_framework.settings import api_settings  # noqa: E402
+
+from benchmarks.api import NO_CACHE, seeded_database  # noqa: E402
+from blog.models import Post  # noqa: E402
+from blog.serializers import PostSerializer  # noqa: E402
+
+VARIANTS = {
+    "JSONRenderer": {},
+    "ORJSONRenderer": settings.REST_FRAMEWORK,
+}
+
+
+def time_render(posts, rounds):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        body = renderer.render(PostSerializer(posts, many=True).data)
+    return (time.perf_counter() - started) / rounds, len(body)
+
+
+def time_view(page_size, requests):
+    client = Client()
+    client.get("/api/blog/posts/", {"page_size": page_size})  # ウォームアップ
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get("/api/blog/posts/", {"page_size": page_size})
+        if response.status_code != 200:
+            raise SystemExit(f"status {response.status_code}")
+    return requests / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with seeded_database(args.posts, args.users):
+        posts = list(Post.objects.for_api()[: args.page_size])
+        for name, rest_framework in VARIANTS.items():
+            with override_settings(
+                REST_FRAMEWORK=rest_framework, CACHES=NO_CACHE, ALLOWED_HOSTS=["*"]
+            ):
+                seconds, size = time_render(posts, args.rounds)
+                rps = time_view(args.page_size, args.rounds)
+            results[name] = (seconds, size, rps)
+
+    print(f"{len(posts)} posts per page")
+    for name, (seconds, size, rps) in results.items():
+        print(
+            f"  {name:<16} render {seconds * 1000:8.2f} ms"
+            f" ({size} bytes)  view {rps:8.1f} req/s"
+        )
+    base, fast = results["JSONRenderer"], results["ORJSONRenderer"]
+    print(
+        f"  speedup          render {base[0] / fast[0]:8.2f}x"
+        f"               view {fast[2] / base[2]:8.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+投稿の一覧出力を PostSerializer (モデル) と PostReadSerializer (.values()) で比較するベンチマーク
+
+1行あたりの時間を、シリアライズのみと、DBからの取得を含めた場合で計測する。
+
+    DATABASE_URL=sqlite:///bench.sqlite3 python -m benchmarks.serializers --rows 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from benchmarks.api import seeded_database  # noqa: E402
+from blog.models import Post  # noqa: E402
+from blog.serializers import PostReadSerializer, PostSerializer  # noqa: E402
+
+
+def per_row(function, rows, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - started) / rounds / rows * 1_000_000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with seeded_database(args.rows, max(args.rows // 50, 1)):
+        queryset = Post.objects.for_api().order_by("id")
+        values = queryset.values(*PostReadSerializer.values_fields)
+        posts, rows = list(queryset), list(values)
+
+        results = {
+            "PostSerializer": (
+                per_row(
+                    lambda: PostSerializer(posts, many=True).data,
+                    args.rows,
+                    args.rounds,
+                ),
+                per_row(
+                    lambda: PostSerializer(queryset.all(), many=True).data,
+                    args.rows,
+                    args.rounds,
+                ),
+            ),
+            "PostReadSerializer": (
+                per_row(
+                    lambda: PostReadSerializer(rows, many=True).data,
+                    args.rows,
+                    args.rounds,
+                ),
+                per_row(
+                    lambda: PostReadSerializer(values.all(), many=True).data,
+                    args.rows,
+                    args.rounds,
+                ),
+            ),
+        }
+
+    print(f"{args.rows} rows (µs per row)")
+    print(f"  {'':<20} {'serialize':>10} {'fetch+serialize':>16}")
+    for name, (serialize, total) in results.items():
+        print(f"  {name:<20} {serialize:>10.2f} {total:>16.2f}")
+    base, fast = results["PostSerializer"], results["PostReadSerializer"]
+    print(f"  {'speedup':<20} {base[0] / fast[0]:>9.2f}x {base[1] / fast[1]:>15.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from blog import signals  # noqa: F401
+        from blog.cache import post_response_cache
+        from blog.stream import hub
+        from config.metrics import registry
+
+        registry.add_collector(post_response_cache.collect_metrics)
+        registry.add_collector(hub.collect_metrics)
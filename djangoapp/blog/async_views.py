@@ -0,0 +1,213 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authentication import CSRFCheck
+from rest_framework.settings import api_settings
+
+from accounts.authentication import SignedTokenAuthentication
+from blog import stream
+from blog.models import Post
+from blog.pagination import PostCursorPagination
+from blog.permissions import IsOwnerOrReadOnly
+from blog.serializers import PostReadSerializer, PostSerializer
+from config.renderers import dumps, loads
+
+
+class AsyncPostView(View):
+    """
+    ASGI用の非同期ビューの基底クラス
+
+    DRFのビューは同期のみのため、ASGIではリクエストごとに sync_to_async で
+    スレッドを占有する。こちらは非同期ORM (aiterator / aget / acreate) を使い、
+    PostSerializer での入出力と IsOwnerOrReadOnly による権限確認はDRF版と揃えている。
+    """
+
+    permission_classes = (IsOwnerOrReadOnly,)
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    throttle_scope = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # DRFの APIView と同じく、CSRFはセッションで認証した場合だけ get_user で確認する
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            # ユーザーの取得とスロットルだけはスレッドで行い、以降は同期アクセスしない
+            await sync_to_async(self.initial)(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(exc)
+
+    def initial(self, request):
+        request.user = self.get_user(request)
+        self.check_throttles(request)
+
+    def check_throttles(self, request):
+        # APIView.check_throttles と同じく、すべてのスロットルで最も長い待ち時間を返す
+        durations = [
+            throttle.wait()
+            for throttle in (cls() for cls in self.throttle_classes)
+            if not throttle.allow_request(request, self)
+        ]
+        if durations:
+            durations = [duration for duration in durations if duration is not None]
+            raise exceptions.Throttled(max(durations, default=None))
+
+    def get_user(self, request):
+        # Bearer トークンがあればトークンで、無ければセッションで認証する
+        result = SignedTokenAuthentication().authenticate(request)
+        if result is not None:
+            return result[0]
+        user = get_user(request)
+        if user.is_authenticated:
+            self.enforce_csrf(request)
+        return user
+
+    def enforce_csrf(self, request):
+        # SessionAuthentication.enforce_csrf と同じ確認 (安全なメソッドは通る)
+        check = CSRFCheck(lambda request: None)
+        check.process_request(request)
+        reason = check.process_view(request, None, (), {})
+        if reason:
+            raise exceptions.PermissionDenied(f"CSRF Failed: {reason}")
+
+    def error_response(self, exc):
+        data = (
+            exc.detail
+            if isinstance(exc.detail, (dict, list))
+            else {"detail": exc.detail}
+        )
+        response = self.json_response(data, status=exc.status_code)
+        # DRFの exception_handler と同じヘッダーを付ける
+        if getattr(exc, "wait", None):
+            response["Retry-After"] = "%d" % exc.wait
+        return response
+
+    def json_response(self, data, status=200):
+        # DRF版と同じ出力にするため、REST_FRAMEWORK のレンダラーと同じ dumps を使う
+        return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+    def get_queryset(self):
+        return Post.objects.for_api().visible_to(self.request.user)
+
+    def parse_body(self, request):
+        if request.content_type == "application/json":
+            try:
+                return loads(request.body or b"{}")
+            except ValueError as exc:
+                raise exceptions.ParseError(f"JSON parse error - {exc}")
+        return QueryDict(request.body)
+
+    def check_authenticated(self, request):
+        # permissions.IsAuthenticatedOrReadOnly と同じ判定
+        # (セッション認証のDRFと同じく、401ではなく403を返す)
+        if not request.user.is_authenticated:
+            raise exceptions.PermissionDenied(
+                exceptions.NotAuthenticated.default_detail
+            )
+
+    def check_object_permissions(self, request, obj):
+        # authorはselect_relatedで取得済みなのでDBにはアクセスしない
+        for permission in self.permission_classes:
+            if not permission().has_object_permission(request, self, obj):
+                raise exceptions.PermissionDenied()
+
+
+class PostListAsyncView(AsyncPostView):
+    permission_classes = ()
+    throttle_scope = "post-list"
+
+    async def get(self, request, *args, **kwargs):
+        paginator = PostCursorPagination()
+        queryset = self.get_queryset().values(*PostReadSerializer.values_fields)
+        posts = await paginator.apaginate_queryset(queryset, request)
+        data = PostReadSerializer(posts, many=True).data
+        return self.json_response(paginator.get_paginated_data(data))
+
+    async def post(self, request, *args, **kwargs):
+        self.check_authenticated(request)
+        serializer = PostSerializer(data=self.parse_body(request))
+        serializer.is_valid(raise_exception=True)
+        post = await Post.objects.acreate(
+            **serializer.validated_data, author=request.user
+        )
+        return self.json_response(PostSerializer(post).data, status=201)
+
+
+class PostDetailAsyncView(AsyncPostView):
+    throttle_scope = "post-detail"
+
+    async def get_object(self, request, pk):
+        try:
+            post = await self.get_queryset().aget(pk=pk)
+        except Post.DoesNotExist:
+            raise exceptions.NotFound()
+        self.check_object_permissions(request, post)
+        return post
+
+    async def get(self, request, pk, *args, **kwargs):
+        post = await self.get_object(request, pk)
+        return self.json_response(PostSerializer(post).data)
+
+    async def put(self, request, pk, *args, **kwargs):
+        return await self.update(request, pk, partial=False)
+
+    async def patch(self, request, pk, *args, **kwargs):
+        return await self.update(request, pk, partial=True)
+
+    async def update(self, request, pk, partial):
+        self.check_authenticated(request)
+        post = await self.get_object(request, pk)
+        serializer = PostSerializer(
+            post, data=self.parse_body(request), partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        for attr, value in serializer.validated_data.items():
+            setattr(post, attr, value)
+        await post.asave()
+        return self.json_response(PostSerializer(post).data)
+
+    async def delete(self, request, pk, *args, **kwargs):
+        self.check_authenticated(request)
+        post = await self.get_object(request, pk)
+        await post.adelete()
+        return HttpResponse(status=204)
+
+
+class StreamUnavailable(exceptions.APIException):
+    status_code = 503
+    default_detail = "Post stream is unavailable."
+    default_code = "stream_unavailable"
+
+
+class PostStreamView(AsyncPostView):
+    """
+    公開中の投稿の作成・更新・公開・非公開をSSEで配信する
+
+    接続していない間の変更は変更フィード (post-changes) で取得する。
+    reset イベントを受け取ったクライアントも変更フィードから再同期する。
+    """
+
+    permission_classes = ()
+
+    async def get(self, request, *args, **kwargs):
+        # WSGIでは非同期のストリームを最後まで読んでから返そうとするため応答できない
+        if not isinstance(request, ASGIRequest):
+            raise StreamUnavailable("Post stream requires ASGI.")
+        try:
+            subscriber = stream.hub.subscribe()
+        except stream.StreamFull:
+            raise StreamUnavailable("Too many post stream connections.")
+        response = StreamingHttpResponse(
+            stream.hub.events(subscriber), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # nginx がバッファリングして配信を遅らせないようにする
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,172 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from blog.conditional import conditional_response, set_validator_headers
+from config import compression
+from config.db_router import use_primary
+from config.metrics import counter_lines
+
+
+class VersionedResponseCache:
+    """
+    テーブル単位のバージョン番号をキーに含めるレスポンスキャッシュ
+
+    投稿や投稿者が変更されるとバージョンを上げるので、古いキャッシュは
+    参照されなくなり、期限切れまで放置される。バックエンドは
+    settings.BLOG_CACHE_ALIAS のキャッシュ (テストはlocmem、本番はRedis) を使う。
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.version_key = f"{namespace}:version"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "BLOG_CACHE_ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        return getattr(settings, "BLOG_CACHE_TIMEOUT", 60)
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # バージョンが追い出された場合でも過去の値と衝突しないよう時刻から始める
+            self.cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def bump_version(self):
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.add(self.version_key, time.time_ns(), timeout=None)
+
+    def make_key(self, request, view_name):
+        # ページングのリンクに使われるホスト名も含めてURL全体をキーにする
+        url = request.build_absolute_uri()
+        digest = hashlib.md5(url.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{self.get_version()}:{view_name}:{digest}"
+
+    def get(self, key):
+        data = self.cache.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.timeout)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def collect_metrics(self):
+        # /metrics に出力するヒット・ミスのカウンター
+        name = self.namespace.replace(":", "_")
+        stats = self.stats()
+        return counter_lines(
+            f"{name}_cache_hits_total", "Response cache hits.", stats["hits"]
+        ) + counter_lines(
+            f"{name}_cache_misses_total", "Response cache misses.", stats["misses"]
+        )
+
+
+post_response_cache = VersionedResponseCache("blog:post")
+
+
+class CachedResponseMixin:
+    """
+    未認証ユーザーのGETレスポンスをpost_response_cacheに保存するミックスイン
+
+    ETag / Last-Modified もデータと一緒に保存するので、キャッシュが有効な間は
+    条件付きGETにもDBへアクセスせずに304を返せる。
+    """
+
+    response_cache = post_response_cache
+    cache_view_name = None
+    compressed_media_type = "application/json"
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        key = self.response_cache.make_key(request, self.cache_view_name)
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            response = conditional_response(
+                request, entry["etag"], entry["last_modified"]
+            )
+            if response is None:
+                response = self.get_compressed_response(request, key, entry)
+            if response is None:
+                response = Response(entry["data"])
+                set_validator_headers(response, entry["etag"], entry["last_modified"])
+                response.compressed_callback = self.get_compressed_callback(
+                    request, key
+                )
+            response["X-Cache"] = "HIT"
+            return response
+
+        # 書き込みでバージョンを上げた直後のミスを遅れているレプリカで埋めると、
+        # 書き込み前のデータが新しいバージョンで BLOG_CACHE_TIMEOUT の間返されるため、
+        # キャッシュに保存するレスポンスはプライマリから読む
+        with use_primary():
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            # ConditionalGetMixin が計算したバリデータ
+            etag, last_modified = getattr(self, "validators", (None, None))
+            self.response_cache.set(
+                key,
+                {"data": response.data, "etag": etag, "last_modified": last_modified},
+            )
+            response.compressed_callback = self.get_compressed_callback(request, key)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def get_compressed_callback(self, request, key):
+        """
+        CompressionMiddleware が圧縮したボディをキャッシュに保存する関数を返す
+
+        保存するのは標準のJSONの出力だけ (ブラウザブルAPIやインデント付きは保存しない)。
+        """
+        if request.accepted_media_type != self.compressed_media_type:
+            return None
+
+        def store(encoding, body):
+            self.response_cache.set(f"{key}:{encoding}", body)
+
+        return store
+
+    def get_compressed_response(self, request, key, entry):
+        """
+        圧縮済みのボディがキャッシュにあれば、レンダリングも圧縮もせずに返す
+        """
+        if request.accepted_media_type != self.compressed_media_type:
+            return None
+        encoding = compression.negotiate(request)
+        if encoding is None:
+            return None
+        # ヒット率はデータのキャッシュで数えるので、こちらは数えない
+        body = self.response_cache.cache.get(f"{key}:{encoding}")
+        if body is None:
+            return None
+        response = HttpResponse(body, content_type=self.compressed_media_type)
+        set_validator_headers(response, entry["etag"], entry["last_modified"])
+        compression.set_encoding_headers(response, encoding)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
@@ -0,0 +1,133 @@
+"""
+投稿の変更フィード
+
+作成・更新された投稿 (updated_at) と削除の記録 (PostTombstone.deleted_at) を
+(時刻, 種類, id) の順に1本の列として返す。種類は投稿が0、削除が1で、
+同じ時刻の変更の順序を決める連番として使う。
+"""
+
+import base64
+import heapq
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.models import Post, PostTombstone
+from blog.serializers import PostReadSerializer
+
+POST = 0
+TOMBSTONE = 1
+
+
+def encode_cursor(position):
+    changed_at, kind, pk = position
+    payload = {"t": changed_at.isoformat(), "k": kind, "i": pk}
+    return base64.urlsafe_b64encode(
+        json.dumps(payload, separators=(",", ":")).encode("ascii")
+    ).decode("ascii")
+
+
+def decode_cursor(encoded):
+    """
+    カーソルを (時刻, 種類, id) にする (不正な場合は ValueError)
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        changed_at = parse_datetime(payload["t"])
+        kind = int(payload["k"])
+        pk = int(payload["i"])
+    except (TypeError, KeyError, UnicodeEncodeError) as exc:
+        raise ValueError(str(exc))
+    if changed_at is None or kind not in (POST, TOMBSTONE):
+        raise ValueError("Invalid cursor")
+    if timezone.is_naive(changed_at):
+        # タイムゾーンの無い時刻は aware な updated_at などと比較できない
+        raise ValueError("Invalid cursor")
+    return changed_at, kind, pk
+
+
+def settled_until():
+    """
+    変更フィードに含める最新の時刻
+
+    updated_at はコミットより前に設定されるため、実行中のトランザクションの変更が
+    後からより古い時刻で現れることがある。CHANGE_FEED_SETTLE_SECONDS より
+    新しい変更は返さず、カーソルを追い越して取りこぼさないようにする。
+    """
+    seconds = getattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 2)
+    return timezone.now() - timedelta(seconds=seconds)
+
+
+def retention_horizon():
+    """
+    これより古いカーソルは削除の記録が圧縮されている可能性がある
+    """
+    days = getattr(settings, "CHANGE_FEED_RETENTION_DAYS", 30)
+    return timezone.now() - timedelta(days=days)
+
+
+def _after(field, kind, position):
+    # (field, kind, id) が position より後ろの行
+    if position is None:
+        return Q()
+    changed_at, position_kind, pk = position
+    if kind > position_kind:
+        return Q(**{f"{field}__gte": changed_at})
+    if kind < position_kind:
+        return Q(**{f"{field}__gt": changed_at})
+    return Q(**{f"{field}__gt": changed_at}) | Q(**{field: changed_at, "id__gt": pk})
+
+
+def get_changes(user, position, limit, until=None):
+    """
+    position より後の変更を最大 limit 件返す
+
+    (変更のリスト, 次のカーソルの位置, まだ続きがあるか) を返す。続きが無ければ
+    次のカーソルの位置は同期した時刻 (until) になる。
+    user に見えない投稿 (他人の下書き) は削除として返す。
+    """
+    until = until or settled_until()
+    posts = (
+        Post.objects.filter(_after("updated_at", POST, position), updated_at__lte=until)
+        .order_by("updated_at", "id")
+        .values("author_id", *PostReadSerializer.values_fields)[: limit + 1]
+    )
+    tombstones = (
+        PostTombstone.objects.filter(
+            _after("deleted_at", TOMBSTONE, position), deleted_at__lte=until
+        )
+        .order_by("deleted_at", "id")
+        .values_list("deleted_at", "id", "post_id")[: limit + 1]
+    )
+
+    rows = heapq.merge(
+        (((row["updated_at"], POST, row["id"]), row) for row in posts),
+        (
+            ((deleted_at, TOMBSTONE, pk), post_id)
+            for deleted_at, pk, post_id in tombstones
+        ),
+        key=lambda item: item[0],
+    )
+    changes = []
+    for key, row in rows:
+        if len(changes) == limit:
+            return changes, position, True
+        changes.append(to_change(user, key[1], row))
+        position = key
+    # 続きが無ければ until まで同期済みなので、変更が無い間もカーソルを進める
+    # (変更の少ないブログで、有効なカーソルが保存期間を過ぎて410にならないようにする)
+    if position is None or position[0] < until:
+        position = (until, TOMBSTONE, 0)
+    return changes, position, False
+
+
+def to_change(user, kind, row):
+    if kind == TOMBSTONE:
+        return {"op": "delete", "id": row}
+    if row["is_published"] or (user.is_authenticated and row["author_id"] == user.pk):
+        return {"op": "upsert", "id": row["id"], "post": PostReadSerializer(row).data}
+    return {"op": "delete", "id": row["id"]}
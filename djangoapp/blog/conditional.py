@@ -0,0 +1,102 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from blog.rendering import RENDER_VERSION
+
+# レスポンスの形式 (シリアライザーのフィールド) を変えたら上げる
+SCHEMA_VERSION = 1
+
+
+def make_etag(*parts):
+    # updated_at が同じでも、レスポンスの形式や本文の変換方式が変われば別のETagにする
+    # (render_posts やフィールドの追加では updated_at を更新しない)
+    value = ":".join(str(part) for part in (SCHEMA_VERSION, RENDER_VERSION, *parts))
+    return quote_etag(hashlib.md5(value.encode("utf-8")).hexdigest())
+
+
+def last_modified_expression():
+    """
+    投稿のレスポンスの最終更新日時 (updated_at と投稿者の username_changed_at の新しい方)
+
+    レスポンスには投稿者のusernameも含まれるため、usernameの変更でも変わるようにする。
+    SQLiteの MAX(a, b) はNULLがあるとNULLになるので Coalesce する。
+    """
+    return Greatest("updated_at", Coalesce("author__username_changed_at", "updated_at"))
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    If-None-Match / If-Modified-Since に一致すれば304 (または412) を返す
+
+    一致しなければNoneを返すので、呼び出し側で通常のレスポンスを生成する。
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def set_validator_headers(response, etag, last_modified):
+    if etag and not response.has_header("ETag"):
+        response["ETag"] = etag
+    if last_modified and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+
+
+class ConditionalGetMixin:
+    """
+    updated_at から計算したETag / Last-Modifiedで条件付きGETに応答するミックスイン
+
+    ビューは get_validators で (etag, last_modified) を返す。
+    条件に一致した場合はシリアライズを行わずに304を返す。
+    投稿者のusernameの変更も last_modified_expression で最終更新日時に含める。
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        raise NotImplementedError(".get_validators() must be overridden.")
+
+    def get(self, request, *args, **kwargs):
+        self.validators = self.get_validators(request, *args, **kwargs)
+        etag, last_modified = self.validators
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        set_validator_headers(response, etag, last_modified)
+        return response
+
+
+class ListConditionalGetMixin(ConditionalGetMixin):
+    def get_validators(self, request, *args, **kwargs):
+        # 削除を検知できるよう、最新のupdated_atに加えて件数もETagに含める
+        state = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(last_modified=Max(last_modified_expression()), count=Count("id"))
+        )
+        etag = make_etag(
+            request.get_full_path(), state["count"], state["last_modified"]
+        )
+        return etag, state["last_modified"]
+
+
+class DetailConditionalGetMixin(ConditionalGetMixin):
+    def get_validators(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        last_modified = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: lookup})
+            .annotate(last_modified=last_modified_expression())
+            .values_list("last_modified", flat=True)
+            .first()
+        )
+        if last_modified is None:
+            return None, None
+        return make_etag(lookup, last_modified), last_modified
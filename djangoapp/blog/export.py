@@ -0,0 +1,37 @@
+import zlib
+
+from blog.models import Post
+from blog.serializers import PostSerializer
+from config.renderers import dumps
+
+
+def export_queryset(since=None):
+    """
+    エクスポート対象の投稿をupdated_at順に返す
+
+    since を指定すると、それより後に更新された投稿だけを対象にする (差分エクスポート)。
+    """
+    queryset = Post.objects.for_api().order_by("updated_at", "id")
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+    return queryset
+
+
+def iter_ndjson(queryset, chunk_size=2000):
+    """
+    投稿を1行1件のJSON (NDJSON) として順に返す
+
+    iterator() によりサーバーサイドカーソルで chunk_size 件ずつ取得するので、
+    テーブルの大きさに関係なくメモリ使用量は一定になる。
+    """
+    for post in queryset.iterator(chunk_size=chunk_size):
+        yield dumps(PostSerializer(post).data) + b"\n"
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
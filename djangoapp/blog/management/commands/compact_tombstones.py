@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import PostTombstone
+
+
+class Command(BaseCommand):
+    help = "変更フィード用の古い削除の記録 (PostTombstone) を削除する"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CHANGE_FEED_RETENTION_DAYS,
+            help="この日数より古い記録を削除する",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="1回のDELETEで削除する件数 (ロックを短くするため)",
+        )
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(days=options["days"])
+        expired = PostTombstone.objects.filter(deleted_at__lt=horizon).order_by("pk")
+        deleted = 0
+        while True:
+            pks = list(expired.values_list("pk", flat=True)[: options["batch_size"]])
+            if not pks:
+                break
+            deleted += PostTombstone.objects.filter(pk__in=pks).delete()[0]
+        self.stdout.write(f"Deleted {deleted} tombstones older than {horizon}.")
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from blog.export import export_queryset, gzip_stream, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = "投稿をNDJSON形式でエクスポートする"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="出力先ファイル (省略時は標準出力)")
+        parser.add_argument(
+            "--since", help="この日時より後に更新された投稿だけを出力する (ISO 8601)"
+        )
+        parser.add_argument("--gzip", action="store_true", help="gzipで圧縮する")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if since is None:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+
+        chunks = iter_ndjson(export_queryset(since), options["chunk_size"])
+        if options["gzip"]:
+            chunks = gzip_stream(chunks)
+
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                self.write_chunks(output, chunks)
+        else:
+            self.write_chunks(sys.stdout.buffer, chunks)
+
+    def write_chunks(self, output, chunks):
+        for chunk in chunks:
+            output.write(chunk)
+        output.flush()
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import rendering
+from blog.cache import post_response_cache
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "本文のHTMLと語数・読了時間が古い (未作成を含む) 投稿を変換し直す"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="1回の bulk_update で更新する件数 (ロックを短くするため)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="RENDER_VERSION が最新の投稿も変換し直す",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        posts = Post.objects.order_by("pk").only("id", "content")
+        if not options["all"]:
+            # 変換の方式が変わったもの (markdown の有無が変わったものを含む)
+            posts = posts.exclude(render_version=rendering.RENDER_VERSION)
+        # 本文は変わらないので updated_at は更新しない (変更フィードにも出さない)
+        # 条件付きGETのETagには RENDER_VERSION が含まれるため、古いHTMLで304にはならない
+        rendered = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # 変換中に本文が更新されて、古い本文のHTMLで上書きしないようにロックする
+                batch = list(
+                    posts.filter(pk__gt=last_pk).select_for_update()[:batch_size]
+                )
+                if not batch:
+                    break
+                for post in batch:
+                    post.set_rendered_content()
+                Post.objects.bulk_update(batch, Post.rendered_fields)
+            rendered += len(batch)
+            last_pk = batch[-1].pk
+        if rendered:
+            post_response_cache.bump_version()
+        self.stdout.write(f"Rendered {rendered} posts.")
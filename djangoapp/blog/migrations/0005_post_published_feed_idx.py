@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_published_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                condition=models.Q(('is_published', True)),
+                fields=['published_at', 'id'],
+                name='post_published_feed_idx',
+            ),
+        ),
+    ]
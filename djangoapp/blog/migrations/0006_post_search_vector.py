@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:43
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from blog import search
+
+
+def create_search_index(apps, schema_editor):
+    # GINインデックスはPostgreSQLでのみ作成する (SQLiteでは部分一致で代用)
+    if not search.is_supported(schema_editor.connection):
+        return
+    schema_editor.execute(
+        "CREATE INDEX post_search_vector_idx ON blog_post USING gin (search_vector)"
+    )
+
+    Post = apps.get_model("blog", "Post")
+    manager = Post.objects.db_manager(schema_editor.connection.alias)
+    posts = manager.only("title", "content")
+    batch = []
+    for post in posts.iterator(chunk_size=2000):
+        post.search_vector = search.build_search_vector(post.title, post.content)
+        batch.append(post)
+        if len(batch) >= 500:
+            manager.bulk_update(batch, ["search_vector"])
+            batch = []
+    if batch:
+        manager.bulk_update(batch, ["search_vector"])
+
+
+def drop_search_index(apps, schema_editor):
+    if not search.is_supported(schema_editor.connection):
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS post_search_vector_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_published_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,7 +1,75 @@
-from django.db import models
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchRank, SearchVectorField
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
 from accounts.models import CustomUser
+from blog import rendering, search
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_published=True)
+
+    def visible_to(self, user):
+        """
+        公開済みの投稿と、userが所有する下書きに絞り込む
+        """
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(models.Q(is_published=True) | models.Q(author=user))
+
+    def search(self, query):
+        """
+        タイトルと本文を全文検索し、関連度 (rank) の高い順に並べる
+
+        PostgreSQLでは search_vector のGINインデックスを使う。
+        それ以外のDB (ローカルのSQLiteなど) では部分一致で代用する。
+        """
+        if search.is_supported(connections[self.db]):
+            search_query = search.build_search_query(query)
+            if search_query is None:
+                return self.none()
+            queryset = self.filter(search_vector=search_query).annotate(
+                rank=SearchRank(models.F("search_vector"), search_query)
+            )
+        else:
+            terms = query.split()
+            if not terms:
+                return self.none()
+            queryset = self
+            for term in terms:
+                queryset = queryset.filter(
+                    models.Q(title__icontains=term) | models.Q(content__icontains=term)
+                )
+            queryset = queryset.annotate(
+                rank=models.Case(
+                    models.When(title__icontains=query.strip(), then=models.Value(1.0)),
+                    default=models.Value(0.5),
+                    output_field=models.FloatField(),
+                )
+            )
+        return queryset.order_by("-rank", "-published_at", "-id")
+
+    def for_api(self):
+        """
+        PostSerializer が必要とするカラムだけを、authorと同じクエリで取得する
+        """
+        return self.select_related("author").only(
+            "id",
+            "title",
+            "author__username",
+            "content",
+            "created_at",
+            "updated_at",
+            "published_at",
+            "is_published",
+            "content_html",
+            "word_count",
+            "reading_time",
+        )
 
 
 class Post(models.Model):
@@ -14,14 +82,187 @@ class Post(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
     is_published = models.BooleanField(default=False)
+    # PostgreSQLでのみ使う全文検索用のベクトル (GINインデックスはマイグレーションで作成)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # 本文から保存時に作るサニタイズ済みのHTMLと、語数・読了時間 (分)
+    content_html = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)
+    # content_html を作った rendering.RENDER_VERSION (古いものは render_posts で作り直す)
+    render_version = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    # DBから読み込んだ時点の (author_id, is_published, published_at)
+    # 投稿者のカウンターの差分を求めるために使う
+    _counter_state = None
+
+    rendered_fields = ("content_html", "word_count", "reading_time", "render_version")
 
     class Meta:
-        ordering = ["published_at"]
+        ordering = ["published_at", "id"]
+        indexes = [
+            # PostCursorPagination のキーセット (published_at, id) 用
+            models.Index(
+                fields=["published_at", "id"], name="post_published_at_id_idx"
+            ),
+            # 公開フィード用の部分インデックス
+            models.Index(
+                fields=["published_at", "id"],
+                condition=models.Q(is_published=True),
+                name="post_published_feed_idx",
+            ),
+            # 変更フィード (updated_at, id) のキーセット用
+            models.Index(fields=["updated_at", "id"], name="post_updated_at_id_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counter_state = instance.get_counter_state()
+        return instance
 
     def save(self, *args, **kwargs):
+        self.set_published_at()
+        update_fields = kwargs.get("update_fields")
+        derived_fields = set()
+        if self.set_search_vector(kwargs.get("using")):
+            derived_fields.add("search_vector")
+        if update_fields is None or "content" in update_fields:
+            self.set_rendered_content()
+            derived_fields.update(self.rendered_fields)
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *derived_fields}
+
+        using = kwargs.get("using") or router.db_for_write(Post, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            if self._counter_state is None and not self._state.adding:
+                self._counter_state = (
+                    Post.objects.using(using)
+                    .filter(pk=self.pk)
+                    .values_list("author_id", "is_published", "published_at")
+                    .first()
+                )
+            # post_save の受信側は _counter_state を保存前の状態として参照する
+            old_state = self._counter_state
+            super(Post, self).save(*args, **kwargs)  # Call the real save() method
+            self._counter_state = self.get_counter_state()
+            Post.update_author_counts([(old_state, self._counter_state)], using)
+
+    def get_counter_state(self):
+        """
+        投稿者のカウンターに影響するフィールドの値 (未取得のフィールドがあればNone)
+        """
+        loaded = self.__dict__
+        if not all(f in loaded for f in ("author_id", "is_published", "published_at")):
+            return None
+        return (self.author_id, self.is_published, self.published_at)
+
+    @staticmethod
+    def update_author_counts(changes, using=None):
+        """
+        投稿の (変更前, 変更後) の状態のリストから、投稿者のカウンターを更新する
+
+        作成時の変更前と削除時の変更後は None。投稿者ごとに F() による
+        UPDATEを1回だけ発行するため、同時に更新されても件数がずれない。
+        最終公開日時は、公開済みの投稿が減った場合だけ集計し直す。
+        """
+        deltas = defaultdict(
+            lambda: {"published": 0, "draft": 0, "recompute": False, "latest": None}
+        )
+        for old_state, new_state in changes:
+            if old_state == new_state:
+                continue
+            for state, sign in ((old_state, -1), (new_state, 1)):
+                if state is None:
+                    continue
+                author_id, is_published, published_at = state
+                delta = deltas[author_id]
+                delta["published" if is_published else "draft"] += sign
+                if is_published and sign < 0:
+                    delta["recompute"] = True
+                elif is_published and published_at is not None:
+                    latest = delta["latest"]
+                    delta["latest"] = max(latest or published_at, published_at)
+
+        users = CustomUser.objects.using(using)
+        for author_id, delta in deltas.items():
+            updates = {}
+            if delta["published"]:
+                updates["published_post_count"] = (
+                    models.F("published_post_count") + delta["published"]
+                )
+            if delta["draft"]:
+                updates["draft_post_count"] = (
+                    models.F("draft_post_count") + delta["draft"]
+                )
+            if delta["recompute"]:
+                updates["last_published_at"] = models.Subquery(
+                    Post.objects.filter(author=models.OuterRef("pk"), is_published=True)
+                    .order_by()
+                    .values("author")
+                    .annotate(last=models.Max("published_at"))
+                    .values("last")
+                )
+            elif delta["latest"] is not None:
+                latest = models.Value(delta["latest"])
+                updates["last_published_at"] = Greatest(
+                    Coalesce("last_published_at", latest), latest
+                )
+            if updates:
+                users.filter(pk=author_id).update(**updates)
+
+    def set_published_at(self):
+        """
+        公開済みで published_at が未設定なら現在時刻を設定する
+
+        save() を経由しない bulk_create / bulk_update からも呼び出す。
+        """
         if self.is_published and self.published_at is None:
             self.published_at = timezone.now()
-        super(Post, self).save(*args, **kwargs)  # Call the real save() method
+
+    def set_search_vector(self, using=None):
+        """
+        タイトルと本文から search_vector を設定する
+
+        全文検索に対応したDBでなければ何もせずFalseを返す。
+        """
+        using = using or router.db_for_write(Post, instance=self)
+        if not search.is_supported(connections[using]):
+            return False
+        self.search_vector = search.build_search_vector(self.title, self.content)
+        return True
+
+    def set_rendered_content(self):
+        """
+        本文からHTMLと語数・読了時間を設定する
+
+        save() を経由しない bulk_create / bulk_update からも呼び出す。
+        """
+        rendered = rendering.render(self.content)
+        self.content_html, self.word_count, self.reading_time = rendered
+        self.render_version = rendering.RENDER_VERSION
 
     def __str__(self):
         return str(self.title)
+
+
+class PostTombstone(models.Model):
+    """
+    削除された投稿の記録 (変更フィードで削除をクライアントに伝えるため)
+
+    古い記録は compact_tombstones コマンドで削除する。
+    """
+
+    post_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deleted_at", "id"], name="tombstone_deleted_at_id_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} ({self.deleted_at})"
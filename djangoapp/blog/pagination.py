@@ -0,0 +1,208 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def query_params(request):
+    # DRFのRequestとDjangoのHttpRequest (非同期ビュー) の両方に対応する
+    return getattr(request, "query_params", request.GET)
+
+
+def row_position(row):
+    # モデルのインスタンスと .values() の行 (dict) の両方に対応する
+    if isinstance(row, dict):
+        return row["published_at"], row["id"]
+    return row.published_at, row.pk
+
+
+class PostCursorPagination(BasePagination):
+    """
+    (published_at, id) のキーセットでページングするカーソルページネーション
+
+    OFFSETを使わず、直前のページの末尾行より後ろの行だけを
+    インデックス範囲スキャンで取得するため、どの深さのページでも一定時間で返せる。
+    published_at が NULL の下書きは PostgreSQL の昇順と同じく末尾に並ぶ。
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = []
+        for page_queryset in self.get_page_querysets(queryset, request):
+            # 1件多く取得して次のページの有無を判定する
+            rows.extend(page_queryset[: self.page_size + 1 - len(rows)])
+            if len(rows) > self.page_size:
+                break
+        return self.set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        非同期ビュー用の paginate_queryset (ASGIでスレッドを占有しない)
+        """
+        rows = []
+        for page_queryset in self.get_page_querysets(queryset, request):
+            page_queryset = page_queryset[: self.page_size + 1 - len(rows)]
+            rows.extend([post async for post in page_queryset.aiterator()])
+            if len(rows) > self.page_size:
+                break
+        return self.set_page(rows)
+
+    def get_page_querysets(self, queryset, request):
+        """
+        ページの行を取得するクエリを、並び順に返す
+
+        published_at が NULL の行とそれ以外の行をORでまとめると
+        インデックスを範囲で検索できないため、カーソルの後ろの範囲ごとに
+        別のクエリにし、前のクエリで足りなかった場合だけ次のクエリを実行する。
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        if self.reverse:
+            queryset = queryset.order_by(
+                F("published_at").desc(nulls_first=True), "-id"
+            )
+            ranges = self._before(*self.position) if self.position else [Q()]
+        else:
+            queryset = queryset.order_by(F("published_at").asc(nulls_last=True), "id")
+            ranges = self._after(*self.position) if self.position else [Q()]
+        return [queryset.filter(q) for q in ranges]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, post, reverse):
+        published_at, post_id = row_position(post)
+        payload = {
+            "p": published_at.isoformat() if published_at is not None else None,
+            "i": post_id,
+            "r": int(reverse),
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("ascii")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = query_params(request).get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            published_at = payload["p"]
+            if published_at is not None:
+                published_at = parse_datetime(published_at)
+                if published_at is None:
+                    raise ValueError
+            post_id = int(payload["i"])
+            reverse = bool(payload["r"])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return (published_at, post_id), reverse
+
+    @staticmethod
+    def _after(published_at, post_id):
+        # 昇順 (NULLは末尾) で (published_at, id) より後ろの行の範囲
+        if published_at is None:
+            return [Q(published_at__isnull=True, id__gt=post_id)]
+        # published_at__gte はインデックスを検索する下限になる
+        return [
+            Q(published_at__gte=published_at)
+            & (Q(published_at__gt=published_at) | Q(id__gt=post_id)),
+            Q(published_at__isnull=True),
+        ]
+
+    @staticmethod
+    def _before(published_at, post_id):
+        # 降順 (NULLは先頭) で (published_at, id) より前の行の範囲
+        if published_at is None:
+            return [
+                Q(published_at__isnull=True, id__lt=post_id),
+                Q(published_at__isnull=False),
+            ]
+        return [
+            Q(published_at__lte=published_at)
+            & (Q(published_at__lt=published_at) | Q(id__lt=post_id))
+        ]
+
+
+class PostSearchPagination(PageNumberPagination):
+    """
+    検索結果は関連度順のため、キーセットではなくページ番号でページングする
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
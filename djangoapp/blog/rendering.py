@@ -0,0 +1,90 @@
+"""
+投稿本文 (Markdown) のHTMLへの変換と、語数・読了時間の計算
+
+保存時に1回だけ変換して Post に保存し、APIのリクエストごとには変換しない。
+markdown と nh3 がインストールされていれば、Markdownとして変換してから
+許可したタグと属性以外を取り除く。無い環境では本文をエスケープして
+段落と改行だけをHTMLにする。
+
+変換の結果が変わる変更をしたら FORMAT_VERSION を上げ、
+render_posts コマンドで既存の投稿を変換し直す。保存する RENDER_VERSION には
+使った変換 (Markdown か、エスケープだけか) も含めるので、markdown と nh3 を
+インストールした後も render_posts で変換し直せる。
+"""
+
+import html
+import math
+import re
+from collections import namedtuple
+
+from django.utils.html import linebreaks, strip_tags
+
+try:
+    import markdown
+    import nh3
+except ImportError:  # pragma: no cover
+    markdown = nh3 = None
+
+FORMAT_VERSION = 2
+RENDER_VERSION = FORMAT_VERSION * 10 + (1 if markdown is not None else 0)
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "sane_lists"]
+ALLOWED_TAGS = {
+    "a", "blockquote", "br", "code", "del", "em", "h1", "h2", "h3", "h4", "h5",
+    "h6", "hr", "img", "li", "ol", "p", "pre", "strong", "table", "tbody", "td",
+    "th", "thead", "tr", "ul",
+}  # fmt: skip
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title"},
+    "th": {"align"},
+    "td": {"align"},
+}
+URL_SCHEMES = {"http", "https", "mailto"}
+
+# 1分あたりに読める英単語数と、日本語など分かち書きしない言語の文字数
+WORDS_PER_MINUTE = 200
+CJK_CHARACTERS_PER_MINUTE = 500
+
+# ひらがな・カタカナ、CJK統合漢字 (拡張A・互換漢字を含む)、ハングル
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_CJK_RE = re.compile(f"[{_CJK}]")
+_WORD_RE = re.compile(f"(?:(?![{_CJK}])[^\\W_])+(?:['’](?:(?![{_CJK}])[^\\W_])+)*")
+
+RenderedContent = namedtuple("RenderedContent", ["html", "word_count", "reading_time"])
+
+
+def render_html(text):
+    """
+    本文をサニタイズ済みのHTMLにする
+    """
+    if not text:
+        return ""
+    if markdown is None:
+        return linebreaks(text, autoescape=True)
+    return nh3.clean(
+        markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS),
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes=URL_SCHEMES,
+        link_rel="nofollow noopener noreferrer",
+    )
+
+
+def count_words(text):
+    """
+    (英単語などの語数, 日本語などの文字数) を返す
+    """
+    return len(_WORD_RE.findall(text)), len(_CJK_RE.findall(text))
+
+
+def render(text):
+    """
+    本文を変換し、HTMLと語数・読了時間 (分、切り上げ) を返す
+
+    語数と読了時間はMarkdownの記号を除いたHTMLのテキストから数える。
+    """
+    content_html = render_html(text)
+    words, characters = count_words(html.unescape(strip_tags(content_html)))
+    minutes = words / WORDS_PER_MINUTE + characters / CJK_CHARACTERS_PER_MINUTE
+    return RenderedContent(content_html, words + characters, math.ceil(minutes))
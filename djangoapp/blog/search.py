@@ -0,0 +1,56 @@
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import TextField, Value
+
+# 英数字の連続と、それ以外の文字 (日本語など) の連続を別々の語として取り出す
+_WORD_RE = re.compile(r"[0-9a-z_]+|[^\W0-9a-z_]+")
+
+SEARCH_CONFIG = "simple"
+
+
+def ngram_tokens(text):
+    """
+    検索用のトークンに分割する
+
+    PostgreSQLの標準パーサーは分かち書きされていない日本語を分割できないため、
+    英数字は単語単位、それ以外の文字は2文字ずつのn-gram (bigram) にする。
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        if word.isascii() or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def is_supported(connection):
+    return connection.vendor == "postgresql"
+
+
+def build_search_vector(title, content):
+    """
+    タイトル (重みA) と本文 (重みB) のトークンからtsvectorを作る式を返す
+    """
+    return SearchVector(
+        Value(" ".join(ngram_tokens(title)), output_field=TextField()),
+        config=SEARCH_CONFIG,
+        weight="A",
+    ) + SearchVector(
+        Value(" ".join(ngram_tokens(content)), output_field=TextField()),
+        config=SEARCH_CONFIG,
+        weight="B",
+    )
+
+
+def build_search_query(query):
+    """
+    すべてのトークンを含む投稿に一致するtsqueryを返す (トークンがなければNone)
+    """
+    tokens = ngram_tokens(query)
+    if not tokens:
+        return None
+    return SearchQuery(" ".join(tokens), config=SEARCH_CONFIG)
@@ -1,8 +1,75 @@
+from django.db.models.functions import Substr
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from blog.models import Post
 
 
+class PostBulkSerializer(serializers.ListSerializer):
+    """
+    複数の投稿を1回の bulk_create / bulk_update で書き込むリストシリアライザ
+
+    save() を経由しないため、Post.set_published_at と set_search_vector、
+    set_rendered_content をここで適用し、投稿者のカウンターもまとめて更新する。
+    """
+
+    batch_size = 500
+
+    def validate_items(self, instances=None):
+        """
+        要素ごとに検証し、(検証済みデータ, エラー) のリストを返す
+
+        不正な要素があっても残りの要素の検証は続ける。
+        """
+        validated_data, errors = [], []
+        for index, item in enumerate(self.initial_data):
+            instance = instances[index] if instances is not None else None
+            child = self.child.__class__(
+                instance, data=item, partial=self.partial, context=self.context
+            )
+            if child.is_valid():
+                validated_data.append(child.validated_data)
+                errors.append({})
+            else:
+                validated_data.append(None)
+                errors.append(child.errors)
+        return validated_data, errors
+
+    def create(self, validated_data):
+        posts = [Post(**attrs) for attrs in validated_data]
+        for post in posts:
+            post.set_published_at()
+            post.set_search_vector()
+            post.set_rendered_content()
+        posts = Post.objects.bulk_create(posts, batch_size=self.batch_size)
+        Post.update_author_counts([(None, post.get_counter_state()) for post in posts])
+        return posts
+
+    def update(self, instance, validated_data):
+        # bulk_update は auto_now を更新しないので updated_at も明示的に設定する
+        now = timezone.now()
+        fields = {"published_at", "updated_at"}
+        changes = []
+        for post, attrs in zip(instance, validated_data):
+            old_state = post._counter_state
+            for attr, value in attrs.items():
+                setattr(post, attr, value)
+            post.set_published_at()
+            if post.set_search_vector():
+                fields.add("search_vector")
+            if "content" in attrs:
+                post.set_rendered_content()
+                fields.update(Post.rendered_fields)
+            post.updated_at = now
+            fields.update(attrs)
+            post._counter_state = post.get_counter_state()
+            changes.append((old_state, post._counter_state))
+        Post.objects.bulk_update(instance, fields, batch_size=self.batch_size)
+        Post.update_author_counts(changes)
+        return instance
+
+
 class PostSerializer(serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source="author.username")
 
@@ -17,4 +84,105 @@ class PostSerializer(serializers.ModelSerializer):
             "updated_at",
             "published_at",
             "is_published",
+            "content_html",
+            "word_count",
+            "reading_time",
         ]
+        list_serializer_class = PostBulkSerializer
+
+
+class PostReadSerializer(serializers.BaseSerializer):
+    """
+    .values() の行 (dict) から PostSerializer と同じ出力を作る読み取り専用シリアライザ
+
+    一覧の出力は固定のカラムなので、ModelSerializer のフィールドごとの
+    処理を通さずに dict を組み立てる。フィールドを変えるときは
+    PostSerializer と揃えること (test_serializers.py で一致を確認している)。
+
+    fields で出力するフィールドを絞り込み、excerpt=True では content の代わりに
+    DBで切り詰めた excerpt_key の値を content として出力する
+    (fields で指定しない限り content_html は出力しない)。
+    """
+
+    # 出力フィールド名と .values() のキー
+    source_fields = {
+        "id": "id",
+        "title": "title",
+        "author": "author__username",
+        "content": "content",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+        "published_at": "published_at",
+        "is_published": "is_published",
+        "content_html": "content_html",
+        "word_count": "word_count",
+        "reading_time": "reading_time",
+    }
+    values_fields = tuple(source_fields.values())
+    datetime_fields = ("created_at", "updated_at", "published_at")
+    excerpt_key = "content_excerpt"
+
+    def __init__(self, *args, fields=None, excerpt=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = fields
+        self.excerpt = excerpt
+
+    @classmethod
+    def get_values(cls, queryset, fields=None, excerpt_length=None, extra=()):
+        """
+        fields の出力に必要なカラムだけを .values() で取得する
+
+        excerpt_length を指定すると、content の先頭 excerpt_length 文字だけを
+        DB側で切り出す (本文全体は読み込まない)。extra には出力しないが
+        必要なカラム (ページングのキーなど) を指定する。
+        """
+        if fields is None:
+            fields = cls.get_field_names(excerpt=excerpt_length is not None)
+        keys = dict.fromkeys(cls.source_fields[name] for name in fields)
+        keys.update(dict.fromkeys(extra))
+        expressions = {}
+        if excerpt_length is not None and "content" in keys:
+            del keys["content"]
+            expressions[cls.excerpt_key] = Substr("content", 1, excerpt_length)
+        return queryset.values(*keys, **expressions)
+
+    def to_representation(self, instance):
+        if self.selected_fields is None and not self.excerpt:
+            data = {
+                "id": instance["id"],
+                "title": instance["title"],
+                "author": instance["author__username"],
+                "content": instance["content"],
+                "created_at": instance["created_at"],
+                "updated_at": instance["updated_at"],
+                "published_at": instance["published_at"],
+                "is_published": instance["is_published"],
+                "content_html": instance["content_html"],
+                "word_count": instance["word_count"],
+                "reading_time": instance["reading_time"],
+            }
+        else:
+            names = self.selected_fields
+            if names is None:
+                names = self.get_field_names(self.excerpt)
+            data = {name: instance[self.get_source_key(name)] for name in names}
+        # DATETIME_FORMAT が設定されている場合は DateTimeField と同じく文字列にする
+        if api_settings.DATETIME_FORMAT is not None:
+            field = serializers.DateTimeField()
+            for name in self.datetime_fields:
+                if data.get(name) is not None:
+                    data[name] = field.to_representation(data[name])
+        return data
+
+    @classmethod
+    def get_field_names(cls, excerpt=False):
+        names = list(cls.source_fields)
+        if excerpt:
+            # 抜粋の一覧で本文全体のHTMLを返さないようにする
+            names.remove("content_html")
+        return names
+
+    def get_source_key(self, name):
+        if name == "content" and self.excerpt:
+            return self.excerpt_key
+        return self.source_fields[name]
@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from blog import stream
+from blog.cache import post_response_cache
+from blog.models import Post, PostTombstone
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_post_response_cache(sender, using, **kwargs):
+    # コミット前に無効化すると、同時のGETが古いデータを新しいバージョンで保存する
+    transaction.on_commit(post_response_cache.bump_version, using=using)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_author_responses(
+    sender, instance, created, update_fields, using, **kwargs
+):
+    # 投稿者のusernameもレスポンスに含まれるため、usernameの変更では無効化する
+    # (ログイン時の last_login の保存などでは無効化しない)
+    if created or not instance.username_changed(update_fields):
+        return
+    invalidate_post_response_cache(sender, using=using, **kwargs)
+
+
+@receiver(post_delete, sender=Post)
+def update_author_post_counts(sender, instance, using, origin=None, **kwargs):
+    # ユーザーの削除による連鎖削除では、ユーザーの行ごと消えるので更新しない
+    if isinstance(origin, CustomUser) or getattr(origin, "model", None) is CustomUser:
+        return
+    state = instance._counter_state or instance.get_counter_state()
+    Post.update_author_counts([(state, None)], using)
+
+
+@receiver(post_delete, sender=Post)
+def record_post_tombstone(sender, instance, using, origin=None, **kwargs):
+    # ユーザーの削除による連鎖削除は record_author_post_tombstones でまとめて記録する
+    if isinstance(origin, CustomUser) or getattr(origin, "model", None) is CustomUser:
+        return
+    PostTombstone.objects.using(using).create(post_id=instance.pk)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def record_author_post_tombstones(sender, instance, using, **kwargs):
+    # 連鎖削除される投稿の削除を、ユーザーと同じトランザクションで1回のINSERTで記録する
+    post_ids = (
+        Post.objects.using(using).filter(author=instance).values_list("pk", flat=True)
+    )
+    PostTombstone.objects.using(using).bulk_create(
+        PostTombstone(post_id=post_id) for post_id in post_ids
+    )
+
+
+@receiver(post_save, sender=Post)
+def publish_post_saved(sender, instance, created, using, **kwargs):
+    # Post.save は post_save の後で _counter_state を保存後の状態に更新する
+    old_state = None if created else instance._counter_state
+    stream.publish_changes(
+        [(instance.pk, old_state, instance.get_counter_state())], using
+    )
+
+
+@receiver(post_delete, sender=Post)
+def publish_post_deleted(sender, instance, using, **kwargs):
+    state = instance._counter_state or instance.get_counter_state()
+    stream.publish_changes([(instance.pk, state, None)], using)
@@ -0,0 +1,310 @@
+"""
+投稿の作成・更新・公開をSSE (Server-Sent Events) で配信するプッシュチャネル
+
+ブローカー (settings.BLOG_STREAM_BROKER) が変更の通知を全プロセスに届け、
+各プロセスの hub が1回の通知につき投稿を1回だけ読み込んでSSEのフレームにし、
+そのプロセスのすべての購読者に同じバイト列を配る。
+
+購読者ごとのキューは BLOG_STREAM_QUEUE_SIZE 件までで、読み出しが追いつかない
+購読者はキューを捨てて reset イベントで切断し、変更フィード
+(/api/blog/posts/changes/) からの再同期を促す。遅い1つの接続のために
+メモリが増え続けたり、他の購読者への配信が遅れたりしないようにする。
+"""
+
+import asyncio
+import functools
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections, transaction
+from django.utils.module_loading import import_string
+
+from blog.models import Post
+from blog.serializers import PostReadSerializer
+from config.db_router import use_primary
+from config.metrics import counter_lines, gauge_lines
+from config.renderers import dumps, loads
+
+logger = logging.getLogger("blog.stream")
+
+CREATED = "created"
+UPDATED = "updated"
+PUBLISHED = "published"
+REMOVED = "removed"
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+RESET_FRAME = b'event: reset\ndata: {"detail":"Subscriber fell behind."}\n\n'
+
+
+def get_event(old_state, new_state):
+    """
+    保存・削除の前後の状態 (Post.get_counter_state) から配信するイベントを決める
+
+    公開中の投稿だけを配信し、下書きの変更は配信しない。
+    """
+    was_published = old_state is not None and old_state[1]
+    is_published = new_state is not None and new_state[1]
+    if is_published:
+        if old_state is None:
+            return CREATED
+        return UPDATED if was_published else PUBLISHED
+    return REMOVED if was_published else None
+
+
+def publish_changes(changes, using=None):
+    """
+    (投稿のid, 変更前の状態, 変更後の状態) のリストをコミット後にブローカーへ送る
+    """
+    messages = []
+    for pk, old_state, new_state in changes:
+        event = get_event(old_state, new_state)
+        if event is not None:
+            messages.append({"event": event, "id": pk})
+    if messages:
+        transaction.on_commit(lambda: get_broker().publish_many(messages), using=using)
+
+
+def render_frame(message):
+    """
+    ブローカーからの通知をSSEのフレームにする (非公開になっていれば None)
+    """
+    event, pk = message["event"], message["id"]
+    if event == REMOVED:
+        data = {"id": pk}
+    else:
+        # コミット直後の投稿がまだレプリカに届いていないことがある
+        with use_primary():
+            row = (
+                Post.objects.for_api()
+                .filter(pk=pk, is_published=True)
+                .values(*PostReadSerializer.values_fields)
+                .first()
+            )
+        if row is None:
+            return None
+        data = PostReadSerializer(row).data
+    return b"event: %s\nid: %d\ndata: %s\n\n" % (event.encode(), pk, dumps(data))
+
+
+class StreamFull(Exception):
+    pass
+
+
+class Subscriber:
+    """
+    1つのSSE接続の送信待ちのキュー
+
+    キューはその接続のイベントループでのみ操作し、他のスレッドからは
+    call_soon_threadsafe で offer を呼ぶ。
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, frame):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # 溜まったイベントを捨て、再同期を促す reset だけを送る
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET_FRAME)
+
+
+class Hub:
+    """
+    このプロセスのSSE接続へのファンアウト
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.overflows = 0
+
+    def subscribe(self):
+        maxsize = getattr(settings, "BLOG_STREAM_QUEUE_SIZE", 100)
+        limit = getattr(settings, "BLOG_STREAM_MAX_SUBSCRIBERS", 1000)
+        subscriber = Subscriber(asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            if len(self._subscribers) >= limit:
+                raise StreamFull()
+            self._subscribers.add(subscriber)
+        get_broker().start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if subscriber.overflowed:
+                self.overflows += 1
+
+    def dispatch(self, message):
+        """
+        通知を1回だけSSEのフレームにして全購読者に配る (どのスレッドから呼んでも良い)
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        try:
+            frame = render_frame(message)
+        except Exception:
+            # 配信の失敗で書き込んだリクエスト (on_commit) を失敗させない
+            logger.exception("Failed to render post stream event %s", message)
+            return
+        if frame is None:
+            return
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, frame)
+            except RuntimeError:
+                # イベントループが終了している (購読の解除はストリーム側で行われる)
+                pass
+
+    async def events(self, subscriber):
+        """
+        購読者に送るフレームを順に返す
+
+        BLOG_STREAM_MAX_SECONDS を過ぎたら接続を終える。切断されたクライアントへの
+        送信はASGIサーバーが黙って捨てるため、終わらない購読が残り続けないようにする
+        (EventSource は retry の間隔で自動的に再接続する)。
+        """
+        keepalive = getattr(settings, "BLOG_STREAM_KEEPALIVE_SECONDS", 15)
+        deadline = time.monotonic() + getattr(settings, "BLOG_STREAM_MAX_SECONDS", 300)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                timeout = min(keepalive, deadline - time.monotonic())
+                if timeout <= 0:
+                    return
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    frame = KEEPALIVE_FRAME
+                yield frame
+                if frame is RESET_FRAME:
+                    return
+        finally:
+            self.unsubscribe(subscriber)
+
+    def collect_metrics(self):
+        with self._lock:
+            subscribers, overflows = len(self._subscribers), self.overflows
+        return gauge_lines(
+            "blog_post_stream_subscribers", "Open post stream connections.", subscribers
+        ) + counter_lines(
+            "blog_post_stream_overflows_total",
+            "Post stream subscribers disconnected for falling behind.",
+            overflows,
+        )
+
+
+hub = Hub()
+
+
+class InProcessBroker:
+    """
+    同じプロセスの hub にだけ配る (テストと単一プロセスでの運用向け)
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def publish(self, message):
+        self.hub.dispatch(message)
+
+    def publish_many(self, messages):
+        for message in messages:
+            self.publish(message)
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    """
+    PostgreSQL の NOTIFY で全プロセスに配る (複数ノードでの運用向け)
+
+    各プロセスは最初の購読時に LISTEN 用の接続を1つだけ開くスレッドを起動し、
+    受け取った通知を hub に渡す。NOTIFY のペイロードは8000バイトまでのため、
+    通知にはイベントの種類とidだけを載せ、投稿は hub が読み込む。
+    """
+
+    channel = "blog_post_events"
+    poll_seconds = 5
+    retry_seconds = 5
+
+    def __init__(self, hub, using=DEFAULT_DB_ALIAS):
+        super().__init__(hub)
+        self.using = using
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self.listen, name="blog-stream-listener", daemon=True
+                )
+                self._thread.start()
+
+    def publish(self, message):
+        self.publish_many([message])
+
+    def publish_many(self, messages):
+        with connections[self.using].cursor() as cursor:
+            for message in messages:
+                cursor.execute(
+                    "SELECT pg_notify(%s, %s)",
+                    [self.channel, dumps(message).decode()],
+                )
+
+    def listen(self):
+        while True:
+            try:
+                self.receive()
+            except Exception:
+                logger.exception(
+                    "Post stream listener failed; reconnecting in %ss",
+                    self.retry_seconds,
+                )
+                time.sleep(self.retry_seconds)
+
+    def receive(self):
+        # リクエストの接続とは別に、LISTEN し続ける専用の接続を開く
+        wrapper = connections.create_connection(self.using)
+        wrapper.ensure_connection()
+        wrapper.set_autocommit(True)
+        connection = wrapper.connection
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            while True:
+                if not select.select([connection], [], [], self.poll_seconds)[0]:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    close_old_connections()
+                    self.hub.dispatch(loads(notify.payload))
+        finally:
+            wrapper.close()
+
+
+@functools.lru_cache
+def _load_broker(path):
+    return import_string(path)(hub)
+
+
+def get_broker():
+    return _load_broker(
+        getattr(settings, "BLOG_STREAM_BROKER", "blog.stream.InProcessBroker")
+    )
@@ -0,0 +1,120 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+from rest_framework import status
+
+from accounts.models import CustomUser
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPostListAsyncView:
+    def setup_method(self):
+        self.client = Client()
+        self.url = reverse("async-post-list")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    def test_list_matches_sync_view(self):
+        """同期版の一覧と同じ内容を返すことを確認"""
+        for i in range(3):
+            Post.objects.create(
+                title=f"Post {i}",
+                content="Content",
+                author=self.user,
+                is_published=True,
+            )
+        Post.objects.create(title="Draft", content="Content", author=self.user)
+
+        response = self.client.get(self.url, {"page_size": 2})
+        sync_response = self.client.get(reverse("post-list"), {"page_size": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["results"] == sync_response.json()["results"]
+        assert body["next"] is not None
+
+        next_page = self.client.get(body["next"]).json()
+        assert [post["title"] for post in next_page["results"]] == ["Post 2"]
+
+    def test_unauthenticated_user_can_not_create_post(self):
+        response = self.client.post(
+            self.url, {"title": "Test Post", "content": "Content"}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_authenticated_user_can_create_post(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            self.url,
+            {"title": "Test Post", "content": "Content", "is_published": True},
+            content_type="application/json",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["author"] == "testuser"
+        post = Post.objects.get(title="Test Post", author=self.user)
+        assert post.published_at is not None
+
+    def test_create_validation_error(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            self.url,
+            {"title": "X" * 201, "content": "Content"},
+            content_type="application/json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "title" in response.json()
+
+
+@pytest.mark.django_db
+class TestPostDetailAsyncView:
+    def setup_method(self):
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.other = CustomUser.objects.create_user(
+            username="other", password="password"
+        )
+        self.post = Post.objects.create(
+            title="Test Post", content="Content", author=self.user, is_published=True
+        )
+        self.url = reverse("async-post-detail", kwargs={"pk": self.post.pk})
+        self.update_data = {"title": "Update Post", "content": "Updated."}
+
+    def test_get_post_detail(self):
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["title"] == "Test Post"
+
+    def test_get_missing_post(self):
+        response = self.client.get(
+            reverse("async-post-detail", kwargs={"pk": self.post.pk + 1})
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_owner_can_update_post(self):
+        self.client.force_login(self.user)
+        response = self.client.put(
+            self.url, self.update_data, content_type="application/json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        self.post.refresh_from_db()
+        assert self.post.title == "Update Post"
+
+    def test_other_user_can_not_update_post(self):
+        """IsOwnerOrReadOnly と同じく投稿者以外は更新できないことを確認"""
+        self.client.force_login(self.other)
+        response = self.client.put(
+            self.url, self.update_data, content_type="application/json"
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        self.post.refresh_from_db()
+        assert self.post.title == "Test Post"
+
+    def test_owner_can_delete_post(self):
+        self.client.force_login(self.user)
+        response = self.client.delete(self.url)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Post.objects.filter(pk=self.post.pk).exists()
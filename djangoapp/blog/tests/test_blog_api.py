@@ -17,7 +17,7 @@ class TestPostList:
         response = self.client.get(self.list_url)
         response = cast(Response, response)
         assert response.status_code == status.HTTP_200_OK
-        assert response.json() == []
+        assert response.json() == {"next": None, "previous": None, "results": []}
 
 
 @pytest.mark.django_db
@@ -0,0 +1,134 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPostBulkView:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-bulk")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.other = CustomUser.objects.create_user(
+            username="other", password="password"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_unauthenticated_user_can_not_bulk_create(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, [{"title": "A"}], format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN  # type: ignore
+
+    def test_bulk_create_in_single_insert(self, django_assert_max_num_queries):
+        """複数の投稿を1回のINSERTで作成し、published_atの規則を適用することを確認"""
+        items = [
+            {"title": f"Post {i}", "content": "Content", "is_published": i % 2 == 0}
+            for i in range(10)
+        ]
+        # SAVEPOINT・INSERT・投稿者のカウンターのUPDATEのみで、
+        # 投稿数に比例してクエリが増えないこと
+        with django_assert_max_num_queries(4):
+            response = self.client.post(self.url, items, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED  # type: ignore
+        assert Post.objects.filter(author=self.user).count() == 10
+        for post in Post.objects.all():
+            assert (post.published_at is not None) == post.is_published
+        results = response.json()["results"]  # type: ignore
+        assert [result["title"] for result in results] == [
+            item["title"] for item in items
+        ]
+        assert all(result["author"] == "testuser" for result in results)
+        self.user.refresh_from_db()
+        assert (self.user.published_post_count, self.user.draft_post_count) == (5, 5)
+
+    def test_bulk_create_reports_item_errors(self):
+        """不正な要素があっても正常な要素は作成されることを確認"""
+        items = [
+            {"title": "Good", "content": "Content"},
+            {"title": "X" * 201, "content": "Content"},
+            {"content": "No title"},
+        ]
+        response = self.client.post(self.url, items, format="json")
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS  # type: ignore
+        body = response.json()  # type: ignore
+        assert body["results"][0]["title"] == "Good"
+        assert body["results"][1:] == [None, None]
+        assert body["errors"][0] == {}
+        assert "title" in body["errors"][1]
+        assert "title" in body["errors"][2]
+        assert list(Post.objects.values_list("title", flat=True)) == ["Good"]
+
+    def test_bulk_create_requires_list(self):
+        response = self.client.post(self.url, {"title": "A"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # type: ignore
+
+    def test_bulk_update_enforces_ownership(self):
+        """他人の投稿は更新されず、自分の投稿だけが更新されることを確認"""
+        own = Post.objects.create(title="Own", content="Content", author=self.user)
+        others = Post.objects.create(
+            title="Others", content="Content", author=self.other, is_published=True
+        )
+        items = [
+            {"id": own.pk, "title": "Updated", "is_published": True},
+            {"id": others.pk, "title": "Hacked"},
+            {"id": 0, "title": "Missing"},
+        ]
+        response = self.client.patch(self.url, items, format="json")
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS  # type: ignore
+        body = response.json()  # type: ignore
+        assert body["results"][0]["title"] == "Updated"
+        assert body["results"][1:] == [None, None]
+        assert body["errors"][0] == {}
+        assert "detail" in body["errors"][1]
+        assert "detail" in body["errors"][2]
+
+        own.refresh_from_db()
+        others.refresh_from_db()
+        assert own.title == "Updated"
+        assert own.published_at is not None
+        assert own.updated_at > own.created_at
+        assert others.title == "Others"
+        self.user.refresh_from_db()
+        assert (self.user.published_post_count, self.user.draft_post_count) == (1, 0)
+        assert self.user.last_published_at == own.published_at
+
+    def test_bulk_delete_enforces_ownership(self):
+        own = Post.objects.create(title="Own", content="Content", author=self.user)
+        others = Post.objects.create(
+            title="Others", content="Content", author=self.other, is_published=True
+        )
+        response = self.client.delete(self.url, [own.pk, others.pk], format="json")
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS  # type: ignore
+        assert response.json()["results"] == [own.pk, None]  # type: ignore
+        assert not Post.objects.filter(pk=own.pk).exists()
+        assert Post.objects.filter(pk=others.pk).exists()
+        self.user.refresh_from_db()
+        assert self.user.draft_post_count == 0
+
+    def test_bulk_create_invalidates_response_cache(
+        self, django_capture_on_commit_callbacks
+    ):
+        """bulk_createでもレスポンスキャッシュが無効化されることを確認"""
+        anonymous = APIClient()
+        anonymous.get(reverse("post-list"))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.post(
+                self.url,
+                [{"title": "New", "content": "Content", "is_published": True}],
+                format="json",
+            )
+
+        response = anonymous.get(reverse("post-list"))
+        assert response["X-Cache"] == "MISS"
+        assert len(response.json()["results"]) == 1  # type: ignore
@@ -0,0 +1,120 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.cache import post_response_cache
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPostResponseCache:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-list")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.post = Post.objects.create(
+            title="Test Post", content="Content", author=self.user, is_published=True
+        )
+        self.detail_url = reverse("post-detail", kwargs={"pk": self.post.pk})
+
+    def test_second_anonymous_get_is_served_from_cache(self, django_assert_num_queries):
+        """2回目の未認証GETがDBにアクセスせずキャッシュから返ることを確認"""
+        first = self.client.get(self.url)
+        assert first["X-Cache"] == "MISS"
+
+        with django_assert_num_queries(0):
+            second = self.client.get(self.url)
+        assert second["X-Cache"] == "HIT"
+        assert second.json() == first.json()  # type: ignore
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"page_size": 1})
+        assert response["X-Cache"] == "MISS"
+
+    def test_post_save_invalidates_cache(self, django_capture_on_commit_callbacks):
+        """投稿の更新後に古いレスポンスが返らないことを確認"""
+        self.client.get(self.detail_url)
+        self.post.title = "Updated"
+        with django_capture_on_commit_callbacks(execute=True):
+            self.post.save()
+
+        response = self.client.get(self.detail_url)
+        assert response["X-Cache"] == "MISS"
+        assert response.json()["title"] == "Updated"  # type: ignore
+
+    def test_post_delete_invalidates_cache(self, django_capture_on_commit_callbacks):
+        self.client.get(self.url)
+        with django_capture_on_commit_callbacks(execute=True):
+            self.post.delete()
+
+        response = self.client.get(self.url)
+        assert response.json()["results"] == []  # type: ignore
+
+    def test_author_change_invalidates_cache(self, django_capture_on_commit_callbacks):
+        """投稿者のusername変更でもキャッシュが無効化されることを確認"""
+        self.client.get(self.url)
+        self.user.username = "renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            self.user.save()
+
+        response = self.client.get(self.url)
+        assert response.json()["results"][0]["author"] == "renamed"  # type: ignore
+
+    def test_login_does_not_invalidate_cache(self, django_capture_on_commit_callbacks):
+        """レスポンスに含まれないフィールドの保存では無効化しないことを確認"""
+        with django_capture_on_commit_callbacks() as callbacks:
+            assert APIClient().login(username="testuser", password="password")
+            user = CustomUser.objects.get(pk=self.user.pk)
+            user.first_name = "Test"
+            user.save()
+            user.username = "renamed"
+            user.save(update_fields=["first_name"])
+        assert callbacks == []
+
+    def test_invalidated_after_commit(self, django_capture_on_commit_callbacks):
+        """書き込みのトランザクションがコミットされるまで無効化しないことを確認"""
+        version = post_response_cache.get_version()
+        with django_capture_on_commit_callbacks() as callbacks:
+            self.post.title = "Updated"
+            self.post.save()
+            assert post_response_cache.get_version() == version
+
+        callbacks[0]()
+        assert post_response_cache.get_version() != version
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        assert not response.has_header("X-Cache")
+
+    def test_not_found_is_not_cached(self):
+        url = reverse("post-detail", kwargs={"pk": self.post.pk + 1})
+        self.client.get(url)
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND  # type: ignore
+        assert response.get("X-Cache") != "HIT"
+
+    def test_hit_and_miss_counters(self):
+        before = post_response_cache.stats()
+        self.client.get(self.url)
+        self.client.get(self.url)
+        after = post_response_cache.stats()
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 1
+
+    def test_cached_conditional_get_returns_304_without_queries(
+        self, django_assert_num_queries
+    ):
+        """キャッシュに保存されたETagで、DBにアクセスせず304を返すことを確認"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED  # type: ignore
+        assert response["X-Cache"] == "HIT"
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog import changes
+from blog.models import Post, PostTombstone
+
+
+@pytest.mark.django_db
+class TestPostChangesView:
+    @pytest.fixture(autouse=True)
+    def no_settle_delay(self, settings):
+        settings.CHANGE_FEED_SETTLE_SECONDS = 0
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-changes")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    def create_post(self, title, **kwargs):
+        return Post.objects.create(
+            title=title, content="Content", author=self.user, **kwargs
+        )
+
+    def test_returns_changes_since_cursor(self):
+        """カーソル以降の作成・更新・削除だけを返すことを確認"""
+        first = self.create_post("First", is_published=True)
+        second = self.create_post("Second", is_published=True)
+
+        body = self.client.get(self.url).json()
+        assert [(c["op"], c["id"]) for c in body["results"]] == [
+            ("upsert", first.pk),
+            ("upsert", second.pk),
+        ]
+        assert body["results"][0]["post"]["title"] == "First"
+        assert body["next"] is None
+        cursor = body["cursor"]
+
+        # 変更が無くても、同期した時刻までカーソルを進める
+        body = self.client.get(self.url, {"cursor": cursor}).json()
+        assert body["results"] == []
+        assert body["next"] is None
+        assert changes.decode_cursor(body["cursor"]) > changes.decode_cursor(cursor)
+        cursor = body["cursor"]
+
+        first.title = "Updated"
+        first.save()
+        second_pk = second.pk
+        self.client.force_authenticate(user=self.user)
+        self.client.delete(reverse("post-detail", kwargs={"pk": second_pk}))
+        body = self.client.get(self.url, {"cursor": cursor}).json()
+        assert [(c["op"], c["id"]) for c in body["results"]] == [
+            ("upsert", first.pk),
+            ("delete", second_pk),
+        ]
+        assert body["results"][0]["post"]["title"] == "Updated"
+
+    def test_pages_through_changes(self):
+        posts = [self.create_post(f"Post {i}", is_published=True) for i in range(5)]
+        tombstone = PostTombstone.objects.create(post_id=999)
+
+        ids = []
+        url = self.url + "?page_size=2"
+        while url:
+            body = self.client.get(url).json()
+            ids.extend(change["id"] for change in body["results"])
+            url = body["next"]
+        assert ids == [post.pk for post in posts] + [tombstone.post_id]
+
+    def test_drafts_are_deletes_for_other_users(self):
+        """他人の下書きは内容を返さず、削除として返すことを確認"""
+        draft = self.create_post("Draft")
+
+        body = self.client.get(self.url).json()
+        assert body["results"] == [{"op": "delete", "id": draft.pk}]
+
+        self.client.force_authenticate(user=self.user)
+        body = self.client.get(self.url).json()
+        assert body["results"][0]["op"] == "upsert"
+
+    def test_unsettled_changes_are_not_returned(self, settings):
+        settings.CHANGE_FEED_SETTLE_SECONDS = 60
+        self.create_post("Post", is_published=True)
+        assert self.client.get(self.url).json()["results"] == []
+
+    def test_user_deletion_records_tombstones(self):
+        """ユーザーの削除で連鎖削除された投稿も削除として記録されることを確認"""
+        posts = [self.create_post(f"Post {i}", is_published=True) for i in range(3)]
+        self.user.delete()
+
+        assert sorted(PostTombstone.objects.values_list("post_id", flat=True)) == [
+            post.pk for post in posts
+        ]
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_naive_cursor_is_invalid(self):
+        """タイムゾーンの無い時刻のカーソルは不正なカーソルとして扱うことを確認"""
+        naive = timezone.now().replace(tzinfo=None)
+        cursor = changes.encode_cursor((naive, changes.POST, 1))
+        response = self.client.get(self.url, {"cursor": cursor})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_quiet_feed_cursor_does_not_expire(self, settings):
+        """変更が無い期間が保存期間より長くても、同期を続けるクライアントは410にならないことを確認"""
+        settings.CHANGE_FEED_RETENTION_DAYS = 30
+        post = self.create_post("Post", is_published=True)
+        Post.objects.filter(pk=post.pk).update(
+            updated_at=timezone.now() - timedelta(days=40)
+        )
+
+        body = self.client.get(self.url).json()
+        assert [change["id"] for change in body["results"]] == [post.pk]
+        response = self.client.get(self.url, {"cursor": body["cursor"]})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_expired_cursor(self, settings):
+        settings.CHANGE_FEED_RETENTION_DAYS = 30
+        old = timezone.now() - timedelta(days=31)
+        cursor = changes.encode_cursor((old, changes.POST, 1))
+        response = self.client.get(self.url, {"cursor": cursor})
+        assert response.status_code == status.HTTP_410_GONE
+
+
+@pytest.mark.django_db
+def test_compact_tombstones_command():
+    old = PostTombstone.objects.create(post_id=1)
+    PostTombstone.objects.filter(pk=old.pk).update(
+        deleted_at=timezone.now() - timedelta(days=31)
+    )
+    recent = PostTombstone.objects.create(post_id=2)
+
+    call_command(
+        "compact_tombstones", "--days", "30", "--batch-size", "1", stdout=StringIO()
+    )
+
+    assert list(PostTombstone.objects.values_list("pk", flat=True)) == [recent.pk]
@@ -0,0 +1,104 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog import conditional
+from blog.models import Post
+from blog.rendering import RENDER_VERSION
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.post = Post.objects.create(
+            title="Test Post", content="Content", author=self.user, is_published=True
+        )
+        self.list_url = reverse("post-list")
+        self.detail_url = reverse("post-detail", kwargs={"pk": self.post.pk})
+
+    def test_detail_has_validators(self):
+        response = self.client.get(self.detail_url)
+        assert response.has_header("ETag")
+        assert response.has_header("Last-Modified")
+
+    def test_detail_if_none_match_returns_304(self, django_assert_num_queries):
+        """ETagが一致すればシリアライズせずに304を返すことを確認"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED  # type: ignore
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    def test_detail_etag_changes_after_update(self, django_capture_on_commit_callbacks):
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.post.title = "Updated"
+        with django_capture_on_commit_callbacks(execute=True):
+            self.post.save()
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        assert response["ETag"] != etag
+
+    def test_detail_if_modified_since_returns_304(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED  # type: ignore
+
+    def test_list_if_none_match_returns_304(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED  # type: ignore
+
+    def test_list_etag_changes_after_delete(self, django_capture_on_commit_callbacks):
+        """削除でmax(updated_at)が変わらなくても件数でETagが変わることを確認"""
+        other = Post.objects.create(
+            title="Other", content="Content", author=self.user, is_published=True
+        )
+        etag = self.client.get(self.list_url)["ETag"]
+        with django_capture_on_commit_callbacks(execute=True):
+            self.post.delete()
+        assert other.updated_at > self.post.updated_at
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+
+    def test_etags_change_after_author_rename(self):
+        """投稿者のusernameを変更すると一覧・詳細のETagが変わることを確認"""
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+        list_etag = self.client.get(self.list_url)["ETag"]
+        self.user.username = "renamed"
+        self.user.save()
+        # 投稿の updated_at は書き換えない
+        assert Post.objects.get().updated_at == self.post.updated_at
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        assert response.json()["author"] == "renamed"  # type: ignore
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+
+    def test_etag_changes_with_render_version(self, monkeypatch):
+        """本文の変換方式が変わると、updated_at が同じでもETagが変わることを確認"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.detail_url)["ETag"]
+        monkeypatch.setattr(conditional, "RENDER_VERSION", RENDER_VERSION + 1)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+
+    def test_list_etag_depends_on_query(self):
+        first = self.client.get(self.list_url)["ETag"]
+        second = self.client.get(self.list_url, {"page_size": 1})["ETag"]
+        assert first != second
@@ -0,0 +1,72 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPostExport:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-export")
+        self.admin = CustomUser.objects.create_superuser(
+            username="admin", password="password", email=""
+        )
+        self.posts = [
+            Post.objects.create(title=f"Post {i}", content="本文", author=self.admin)
+            for i in range(3)
+        ]
+
+    def _lines(self, content):
+        return [json.loads(line) for line in content.decode("utf-8").splitlines()]
+
+    def test_non_admin_can_not_export(self):
+        user = CustomUser.objects.create_user(username="user", password="password")
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN  # type: ignore
+
+    def test_export_streams_ndjson(self):
+        """全投稿 (下書きを含む) が1行1件で出力されることを確認"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = self._lines(b"".join(response.streaming_content))
+        assert [row["title"] for row in rows] == ["Post 0", "Post 1", "Post 2"]
+        assert rows[0]["content"] == "本文"
+        assert rows[0]["author"] == "admin"
+
+    def test_export_since_returns_only_updated_posts(self):
+        self.client.force_authenticate(user=self.admin)
+        since = self.posts[0].updated_at.isoformat()
+        response = self.client.get(self.url, {"since": since})
+        rows = self._lines(b"".join(response.streaming_content))
+        assert [row["title"] for row in rows] == ["Post 1", "Post 2"]
+
+    def test_export_invalid_since(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {"since": "yesterday"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # type: ignore
+
+    def test_export_gzip(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {"compress": "gzip"})
+        assert response["Content-Type"] == "application/gzip"
+        content = gzip.decompress(b"".join(response.streaming_content))
+        assert len(self._lines(content)) == 3
+
+    def test_export_posts_command(self, tmp_path):
+        output = tmp_path / "posts.ndjson.gz"
+        call_command("export_posts", output=str(output), gzip=True, chunk_size=2)
+        rows = self._lines(gzip.decompress(output.read_bytes()))
+        assert [row["id"] for row in rows] == [post.pk for post in self.posts]
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPublishedFeed:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-feed")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        Post.objects.create(
+            title="Published", content="Content", author=self.user, is_published=True
+        )
+        Post.objects.create(title="Draft", content="Content", author=self.user)
+
+    def test_feed_contains_only_published_posts(self):
+        """下書きは投稿者本人にもフィードに表示されないことを確認"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        titles = [post["title"] for post in response.json()["results"]]  # type: ignore
+        assert titles == ["Published"]
+
+    def test_feed_query_uses_partial_index(self):
+        """フィードのクエリが部分インデックスを使うことをEXPLAINで確認"""
+        queryset = (
+            Post.objects.for_api()
+            .published()
+            .order_by(F("published_at").asc(nulls_last=True), "id")[:21]
+        )
+        if connection.vendor == "postgresql":
+            # 行数が少ないとシーケンシャルスキャンが選ばれるため無効にする
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        assert "post_published_feed_idx" in queryset.explain()
+
+
+@pytest.mark.django_db
+class TestDraftVisibility:
+    def setup_method(self):
+        self.client = APIClient()
+        self.owner = CustomUser.objects.create_user(
+            username="owner", password="password"
+        )
+        self.other = CustomUser.objects.create_user(
+            username="other", password="password"
+        )
+        self.draft = Post.objects.create(
+            title="Draft", content="Content", author=self.owner
+        )
+        self.list_url = reverse("post-list")
+        self.detail_url = reverse("post-detail", kwargs={"pk": self.draft.pk})
+
+    def _titles(self):
+        response = self.client.get(self.list_url)
+        return [post["title"] for post in response.json()["results"]]  # type: ignore
+
+    def test_anonymous_user_can_not_see_drafts(self):
+        assert self._titles() == []
+        response = self.client.get(self.detail_url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND  # type: ignore
+
+    def test_other_user_can_not_see_drafts(self):
+        self.client.force_authenticate(user=self.other)
+        assert self._titles() == []
+        response = self.client.get(self.detail_url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND  # type: ignore
+
+    def test_owner_can_see_own_drafts(self):
+        self.client.force_authenticate(user=self.owner)
+        assert self._titles() == ["Draft"]
+        response = self.client.get(self.detail_url)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+from blog.pagination import PostCursorPagination
+
+
+@pytest.mark.django_db
+class TestPostCursorPagination:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-list")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        # 下書きも一覧に含まれるよう投稿者として認証する
+        self.client.force_authenticate(user=self.user)
+        base = timezone.now()
+        # 同じ published_at を持つ投稿と下書き (published_at=NULL) を混ぜる
+        for i in range(5):
+            Post.objects.create(
+                title=f"Post {i}",
+                content="Content",
+                author=self.user,
+                published_at=base + timedelta(minutes=i // 2),
+                is_published=True,
+            )
+        for i in range(2):
+            Post.objects.create(title=f"Draft {i}", content="Content", author=self.user)
+        self.expected = [
+            "Post 0",
+            "Post 1",
+            "Post 2",
+            "Post 3",
+            "Post 4",
+            "Draft 0",
+            "Draft 1",
+        ]
+
+    def _titles(self, response):
+        return [post["title"] for post in response.json()["results"]]
+
+    def test_walk_forward_through_all_pages(self):
+        """nextカーソルを辿ると全件が重複・欠落なく順番に取得できることを確認"""
+        titles = []
+        url = f"{self.url}?page_size=2"
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK  # type: ignore
+            titles += self._titles(response)
+            url = response.json()["next"]  # type: ignore
+        assert titles == self.expected
+
+    def test_walk_backward_from_last_page(self):
+        """previousカーソルで逆方向に辿れることを確認"""
+        url = f"{self.url}?page_size=3"
+        pages = []
+        while url:
+            response = self.client.get(url)
+            pages.append(self._titles(response))
+            last = response
+            url = response.json()["next"]  # type: ignore
+
+        url = last.json()["previous"]  # type: ignore
+        backward = []
+        while url:
+            response = self.client.get(url)
+            backward.insert(0, self._titles(response))
+            url = response.json()["previous"]  # type: ignore
+        assert backward == pages[:-1]
+
+    def test_first_page_has_no_previous(self):
+        response = self.client.get(f"{self.url}?page_size=2")
+        assert response.json()["previous"] is None  # type: ignore
+        assert response.json()["next"] is not None  # type: ignore
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(f"{self.url}?cursor=invalid")
+        assert response.status_code == status.HTTP_404_NOT_FOUND  # type: ignore
+
+    def test_cursor_queries_seek_the_index(self):
+        """カーソル以降の行をインデックスの範囲検索で取得することをEXPLAINで確認"""
+        post = Post.objects.get(title="Post 2")
+        queryset = Post.objects.order_by(F("published_at").asc(nulls_last=True), "id")
+        ranges = PostCursorPagination._after(
+            post.published_at, post.pk
+        ) + PostCursorPagination._before(post.published_at, post.pk)
+        for q in ranges:
+            if connection.vendor == "postgresql":
+                # 行数が少ないとシーケンシャルスキャンが選ばれるため無効にする
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                assert "Index Cond" in queryset.filter(q)[:21].explain()
+            else:
+                plan = queryset.filter(q)[:21].explain()
+                assert "SEARCH blog_post USING INDEX post_published_at_id_idx" in plan
@@ -0,0 +1,128 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog import rendering
+from blog.models import Post
+
+
+def test_render_escapes_html():
+    """本文のHTMLタグは実行されない形で出力されることを確認"""
+    rendered = rendering.render('Hello <script>alert("x")</script>')
+
+    assert "<script>" not in rendered.html
+    assert rendered.html.startswith("<p>")
+
+
+def test_render_counts_words_and_characters():
+    """英単語は語ごと、日本語は文字ごとに数え、読了時間を切り上げることを確認"""
+    assert rendering.count_words("Don't stop, 日本語です") == (2, 5)
+
+    rendered = rendering.render("word " * 201)
+    assert rendered.word_count == 201
+    assert rendered.reading_time == 2
+
+    rendered = rendering.render("あ" * 500)
+    assert rendered.word_count == 500
+    assert rendered.reading_time == 1
+
+
+def test_render_empty():
+    assert rendering.render("") == ("", 0, 0)
+
+
+@pytest.mark.django_db
+class TestRenderedContent:
+    def setup_method(self):
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    def test_rendered_on_save(self):
+        """保存時に本文を変換し、本文を含まない update_fields では変換しないことを確認"""
+        post = Post.objects.create(title="Post", content="first post", author=self.user)
+        post.refresh_from_db()
+        assert post.content_html == rendering.render_html("first post")
+        assert post.word_count == 2
+        assert post.render_version == rendering.RENDER_VERSION
+
+        post.content = "the second post"
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        assert post.word_count == 3
+
+        Post.objects.filter(pk=post.pk).update(word_count=0)
+        post.title = "Renamed"
+        post.save(update_fields=["title"])
+        post.refresh_from_db()
+        assert post.word_count == 0
+
+    def test_bulk_create_renders(self):
+        """一括作成・一括更新でも変換されることを確認"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse("post-bulk")
+
+        response = client.post(
+            url, [{"title": "Post", "content": "one two"}], format="json"
+        )
+        post = Post.objects.get(pk=response.json()["results"][0]["id"])
+        assert post.word_count == 2
+
+        client.patch(url, [{"id": post.pk, "content": "one"}], format="json")
+        post.refresh_from_db()
+        assert post.word_count == 1
+        assert post.content_html == rendering.render_html("one")
+
+    def test_serializer_returns_rendered_content(self):
+        post = Post.objects.create(
+            title="Post", content="one two", author=self.user, is_published=True
+        )
+
+        data = APIClient().get(reverse("post-detail", args=[post.pk])).json()
+
+        assert data["content_html"] == post.content_html
+        assert data["word_count"] == 2
+        assert data["reading_time"] == 1
+
+    def test_render_posts_command(self):
+        """古い投稿だけをバッチごとに変換し直すことを確認"""
+        posts = [
+            Post.objects.create(title=f"Post {i}", content="one two", author=self.user)
+            for i in range(3)
+        ]
+        Post.objects.filter(pk__in=[posts[0].pk, posts[2].pk]).update(
+            content_html="", word_count=0, render_version=0
+        )
+        Post.objects.filter(pk=posts[1].pk).update(word_count=0)
+
+        out = StringIO()
+        call_command("render_posts", "--batch-size", "1", stdout=out)
+
+        counts = dict(Post.objects.values_list("pk", "word_count"))
+        assert counts == {posts[0].pk: 2, posts[1].pk: 0, posts[2].pk: 2}
+        assert "Rendered 2 posts." in out.getvalue()
+
+        call_command("render_posts", "--all", stdout=StringIO())
+        assert Post.objects.filter(word_count=2).count() == 3
+
+    def test_render_posts_after_renderer_changes(self):
+        """markdown の有無が違う環境で変換した投稿も変換し直すことを確認"""
+        post = Post.objects.create(title="Post", content="one two", author=self.user)
+        # もう一方の変換 (Markdown とエスケープだけ) で保存された状態にする
+        other_version = rendering.RENDER_VERSION ^ 1
+        Post.objects.filter(pk=post.pk).update(
+            word_count=0, render_version=other_version
+        )
+
+        out = StringIO()
+        call_command("render_posts", stdout=out)
+
+        post.refresh_from_db()
+        assert post.word_count == 2
+        assert post.render_version == rendering.RENDER_VERSION
+        assert "Rendered 1 posts." in out.getvalue()
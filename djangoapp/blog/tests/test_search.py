@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+from blog.search import ngram_tokens
+
+
+class TestNgramTokens:
+    def test_japanese_text_is_split_into_bigrams(self):
+        assert ngram_tokens("東京都") == ["東京", "京都"]
+
+    def test_ascii_words_are_kept(self):
+        assert ngram_tokens("Django REST") == ["django", "rest"]
+
+    def test_mixed_text(self):
+        """英数字と日本語の境界で分割し、全角英数字は正規化されることを確認"""
+        assert ngram_tokens("Ｄｊａｎｇｏ入門") == ["django", "入門"]
+
+
+@pytest.mark.django_db
+class TestPostSearch:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("post-search")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        Post.objects.create(
+            title="京都旅行",
+            content="東京から京都へ行きました。",
+            author=self.user,
+            is_published=True,
+        )
+        Post.objects.create(
+            title="Django入門",
+            content="京都で勉強会がありました。",
+            author=self.user,
+            is_published=True,
+        )
+        Post.objects.create(title="京都の下書き", content="非公開", author=self.user)
+
+    def _titles(self, params):
+        response = self.client.get(self.url, params)
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        return [post["title"] for post in response.json()["results"]]  # type: ignore
+
+    def test_search_japanese(self):
+        """タイトルに一致する投稿が本文だけに一致する投稿より上位になることを確認"""
+        assert self._titles({"q": "京都"}) == ["京都旅行", "Django入門"]
+
+    def test_search_requires_all_terms(self):
+        assert self._titles({"q": "京都 django"}) == ["Django入門"]
+
+    def test_search_without_match(self):
+        assert self._titles({"q": "大阪"}) == []
+
+    def test_search_shows_drafts_only_to_owner(self):
+        self.client.force_authenticate(user=self.user)
+        assert "京都の下書き" in self._titles({"q": "京都"})
+
+    def test_search_requires_query(self):
+        response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # type: ignore
@@ -0,0 +1,56 @@
+import pytest
+from django.db.models import F
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+from blog.serializers import PostReadSerializer, PostSerializer
+from config.renderers import ORJSONRenderer
+
+
+@pytest.mark.django_db
+class TestPostReadSerializer:
+    def setup_method(self):
+        self.user = CustomUser.objects.create_user(
+            username="テストユーザー", password="password"
+        )
+        Post.objects.create(
+            title="公開済み", content="本文\n改行", author=self.user, is_published=True
+        )
+        Post.objects.create(title="Draft", content="", author=self.user)
+
+    def render_both(self, renderer):
+        posts = Post.objects.for_api().order_by("id")
+        rows = posts.values(*PostReadSerializer.values_fields)
+        return (
+            renderer.render(PostSerializer(posts, many=True).data),
+            renderer.render(PostReadSerializer(rows, many=True).data),
+        )
+
+    def test_output_matches_post_serializer(self):
+        """PostSerializer と同じバイト列を出力することを確認"""
+        expected, actual = self.render_both(ORJSONRenderer())
+        assert actual == expected
+
+    @override_settings(REST_FRAMEWORK={"DATETIME_FORMAT": "iso-8601"})
+    def test_output_matches_with_datetime_format(self):
+        """DATETIME_FORMAT で文字列にする場合も同じ出力になることを確認"""
+        expected, actual = self.render_both(JSONRenderer())
+        assert actual == expected
+
+    def test_fields_match_post_serializer(self):
+        row = Post.objects.values(*PostReadSerializer.values_fields).first()
+        assert list(PostReadSerializer(row).data) == PostSerializer.Meta.fields
+
+    def test_list_view_matches_post_serializer(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse("post-list"))
+        posts = Post.objects.for_api().order_by(
+            F("published_at").asc(nulls_last=True), "id"
+        )
+        expected = ORJSONRenderer().render(PostSerializer(posts, many=True).data)
+        assert ORJSONRenderer().render(response.data["results"]) == expected
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import stream
+from blog.models import Post
+
+
+def test_get_event():
+    """保存・削除の前後の公開状態から配信するイベントを決めることを確認"""
+    published = (1, True, None)
+    draft = (1, False, None)
+
+    assert stream.get_event(None, published) == stream.CREATED
+    assert stream.get_event(draft, published) == stream.PUBLISHED
+    assert stream.get_event(published, published) == stream.UPDATED
+    assert stream.get_event(published, draft) == stream.REMOVED
+    assert stream.get_event(published, None) == stream.REMOVED
+    assert stream.get_event(None, draft) is None
+    assert stream.get_event(draft, draft) is None
+    assert stream.get_event(draft, None) is None
+
+
+def test_subscriber_overflow_resets():
+    """読み出しが追いつかない購読者は溜まったイベントを捨てて reset だけを受け取ることを確認"""
+
+    async def run():
+        subscriber = stream.Subscriber(asyncio.get_running_loop(), maxsize=2)
+        for frame in (b"1", b"2", b"3", b"4"):
+            subscriber.offer(frame)
+        frames = [frame async for frame in stream.Hub().events(subscriber)]
+        return subscriber, frames
+
+    subscriber, frames = asyncio.run(run())
+
+    assert subscriber.overflowed
+    assert frames[1:] == [stream.RESET_FRAME]
+
+
+@pytest.mark.django_db
+class TestPostStreamView:
+    def setup_method(self):
+        self.url = reverse("async-post-stream")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    def create_post(self, django_capture_on_commit_callbacks, **kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            return Post.objects.create(
+                title="Post", content="Content", author=self.user, **kwargs
+            )
+
+    def test_streams_post_events(self, django_capture_on_commit_callbacks):
+        """公開した投稿の作成・更新・非公開がSSEで届き、下書きは届かないことを確認"""
+
+        def change_posts():
+            self.create_post(django_capture_on_commit_callbacks)
+            post = self.create_post(
+                django_capture_on_commit_callbacks, is_published=True
+            )
+            with django_capture_on_commit_callbacks(execute=True):
+                post.title = "Updated"
+                post.save()
+            with django_capture_on_commit_callbacks(execute=True):
+                post.is_published = False
+                post.save()
+            return post
+
+        async def run():
+            response = await AsyncClient().get(self.url)
+            events = aiter(response.streaming_content)
+            first = await anext(events)
+            post = await sync_to_async(change_posts)()
+            frames = [await anext(events) for _ in range(3)]
+            await events.aclose()
+            return response, first, post, frames
+
+        response, first, post, frames = async_to_sync(run)()
+
+        assert response["Content-Type"] == "text/event-stream"
+        assert first.startswith(b"retry:")
+        assert [frame.split(b"\n")[:2] for frame in frames] == [
+            [b"event: created", b"id: %d" % post.pk],
+            [b"event: updated", b"id: %d" % post.pk],
+            [b"event: removed", b"id: %d" % post.pk],
+        ]
+        assert b'"title":"Updated"' in frames[1]
+        assert not stream.hub._subscribers
+
+    def test_dispatch_renders_once(self):
+        """購読者が何人でも、1回の通知で投稿を1回だけ読み込むことを確認"""
+        post = Post.objects.create(
+            title="Post", content="Content", author=self.user, is_published=True
+        )
+
+        def dispatch():
+            with CaptureQueriesContext(connection) as queries:
+                stream.hub.dispatch({"event": stream.PUBLISHED, "id": post.pk})
+            return len(queries)
+
+        async def run():
+            subscribers = [stream.hub.subscribe() for _ in range(3)]
+            queries = await sync_to_async(dispatch)()
+            await asyncio.sleep(0)
+            for subscriber in subscribers:
+                stream.hub.unsubscribe(subscriber)
+            return subscribers, queries
+
+        subscribers, queries = async_to_sync(run)()
+
+        assert queries == 1
+        frames = [subscriber.queue.get_nowait() for subscriber in subscribers]
+        assert frames[0] is frames[1] is frames[2]
+
+    @override_settings(BLOG_STREAM_MAX_SUBSCRIBERS=0)
+    def test_too_many_subscribers(self):
+        """同時接続数の上限を超えると503を返すことを確認"""
+
+        async def run():
+            return await AsyncClient().get(self.url)
+
+        response = async_to_sync(run)()
+
+        assert response.status_code == 503
+
+    def test_requires_asgi(self):
+        """WSGIでは503を返すことを確認"""
+        response = Client().get(self.url)
+
+        assert response.status_code == 503
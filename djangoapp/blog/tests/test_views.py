@@ -90,29 +90,127 @@ class TestPostListView:
             content="Content",
             author=self.user,
             published_at="2024-01-01T00:00:00Z",
+            is_published=True,
         )
         Post.objects.create(
             title="Middle Post",
             content="Content",
             author=self.user,
             published_at="2024-06-01T00:00:00Z",
+            is_published=True,
         )
         Post.objects.create(
             title="New Post",
             content="Content",
             author=self.user,
             published_at="2024-12-01T00:00:00Z",
+            is_published=True,
         )
 
         response = self.client.get(self.url)
         assert response.status_code == status.HTTP_200_OK  # type: ignore
 
-        results = response.json()  # type: ignore
+        results = response.json()["results"]  # type: ignore
         post_titles = [post["title"] for post in results]
 
         # `published_at` が古い順に並んでいるか
         assert post_titles == ["Old Post", "Middle Post", "New Post"]
 
+    def test_list_query_count_is_constant(self, django_assert_num_queries):
+        """
+        投稿数に関係なく、一覧取得がETag用の集計と一覧の2クエリで済むことを確認
+        (N+1の防止)
+        """
+        for i in range(10):
+            author = CustomUser.objects.create_user(
+                username=f"author{i}", password="password"
+            )
+            Post.objects.create(
+                title=f"Post {i}", content="Content", author=author, is_published=True
+            )
+
+        with django_assert_num_queries(2):
+            response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        results = response.json()["results"]  # type: ignore
+        assert len(results) == 10
+        assert {post["author"] for post in results} == {f"author{i}" for i in range(10)}
+
+    def test_datetimes_use_local_offset(self):
+        """日時はDRFの既定と同じく TIME_ZONE (+09:00) の形式で返すことを確認"""
+        Post.objects.create(
+            title="Post",
+            content="Content",
+            author=self.user,
+            published_at="2024-01-01T00:00:00Z",
+            is_published=True,
+        )
+
+        post = self.client.get(self.url).json()["results"][0]  # type: ignore
+
+        assert post["published_at"] == "2024-01-01T09:00:00+09:00"
+        assert post["created_at"].endswith("+09:00")
+
+    def test_sparse_fields(self, django_assert_num_queries):
+        """?fields= で指定したフィールドだけを返し、SELECTも絞り込むことを確認"""
+        Post.objects.create(
+            title="Post", content="Long content", author=self.user, is_published=True
+        )
+
+        with django_assert_num_queries(2) as context:
+            response = self.client.get(self.url, {"fields": "title,id"})
+
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        assert response.json()["results"] == [  # type: ignore
+            {"id": Post.objects.get().pk, "title": "Post"}
+        ]
+        sql = context.captured_queries[-1]["sql"]
+        assert '"content"' not in sql
+        assert "accounts_customuser" not in sql
+
+    @pytest.mark.parametrize("fields", [",", " ", " , "])
+    def test_sparse_fields_empty(self, fields):
+        """空や空白だけの ?fields= は指定なしと同じく全フィールドを返すことを確認"""
+        Post.objects.create(
+            title="Post", content="Content", author=self.user, is_published=True
+        )
+
+        response = self.client.get(self.url, {"fields": fields})
+
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        expected = self.client.get(self.url).json()["results"]  # type: ignore
+        assert response.json()["results"] == expected  # type: ignore
+
+    def test_sparse_fields_unknown_field(self):
+        response = self.client.get(self.url, {"fields": "title,password"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # type: ignore
+        assert "fields" in response.json()  # type: ignore
+
+    def test_excerpt(self, django_assert_num_queries):
+        """?excerpt= で content をDB側で切り詰めて返すことを確認"""
+        Post.objects.create(
+            title="Post",
+            content="あいうえお" * 100,
+            author=self.user,
+            is_published=True,
+        )
+
+        with django_assert_num_queries(2) as context:
+            response = self.client.get(self.url, {"excerpt": 10})
+
+        assert response.status_code == status.HTTP_200_OK  # type: ignore
+        post = response.json()["results"][0]  # type: ignore
+        assert post["content"] == "あいうえおあいうえお"
+        assert post["title"] == "Post"
+        assert "content_html" not in post
+        assert 'AS "content_excerpt"' in context.captured_queries[-1]["sql"]
+
+    @pytest.mark.parametrize("excerpt", ["0", "abc", "1001"])
+    def test_excerpt_invalid(self, excerpt):
+        response = self.client.get(self.url, {"excerpt": excerpt})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # type: ignore
+
 
 @pytest.mark.django_db
 class TestPostDetailView:
@@ -122,7 +220,10 @@ class TestPostDetailView:
             username="testuser", password="password"
         )
         self.post = Post.objects.create(
-            title="Test Post", content="This is a test content.", author=self.user
+            title="Test Post",
+            content="This is a test content.",
+            author=self.user,
+            is_published=True,
         )
         self.detail_url = reverse("post-detail", kwargs={"pk": self.post.pk})
         self.update_data = {
@@ -154,3 +255,9 @@ class TestPostDetailView:
         assert post.title == self.update_data["title"]  # type: ignore
         assert post.content == self.update_data["content"]  # type: ignore
         assert post.author == self.user  # type: ignore
+
+    def test_detail_query_count(self, django_assert_num_queries):
+        """詳細取得でauthorを別クエリで取得しないことを確認 (ETag用の1クエリを含む)"""
+        with django_assert_num_queries(2):
+            response = self.client.get(self.detail_url)
+        assert response.json()["author"] == "testuser"  # type: ignore
@@ -1,8 +1,28 @@
 from django.urls import path
 
-from blog import views
+from blog import async_views, views
 
 urlpatterns = [
     path("posts/", views.PostListView.as_view(), name="post-list"),
+    path("posts/export/", views.PostExportView.as_view(), name="post-export"),
+    path("posts/changes/", views.PostChangesView.as_view(), name="post-changes"),
+    path("posts/bulk/", views.PostBulkView.as_view(), name="post-bulk"),
     path("posts/<int:pk>", views.PostDetailView.as_view(), name="post-detail"),
+    path("search/", views.PostSearchView.as_view(), name="post-search"),
+    path("feed/", views.PublishedFeedView.as_view(), name="post-feed"),
+    path(
+        "async/posts/",
+        async_views.PostListAsyncView.as_view(),
+        name="async-post-list",
+    ),
+    path(
+        "async/posts/<int:pk>",
+        async_views.PostDetailAsyncView.as_view(),
+        name="async-post-detail",
+    ),
+    path(
+        "async/posts/stream/",
+        async_views.PostStreamView.as_view(),
+        name="async-post-stream",
+    ),
 ]
@@ -1,23 +1,425 @@
-from rest_framework import generics, permissions
+from contextlib import ExitStack
 
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import (
+    APIException,
+    NotFound,
+    PermissionDenied,
+    ValidationError,
+)
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from blog import changes, stream
+from blog.cache import CachedResponseMixin, post_response_cache
+from blog.conditional import DetailConditionalGetMixin, ListConditionalGetMixin
+from blog.export import export_queryset, gzip_stream, iter_ndjson
 from blog.models import Post
+from blog.pagination import PostCursorPagination, PostSearchPagination
 from blog.permissions import IsOwnerOrReadOnly
-from blog.serializers import PostSerializer
+from blog.serializers import PostReadSerializer, PostSerializer
+from config.db_router import is_pinned, pin_primary, use_primary
+
+
+class ReadYourWritesMixin:
+    """
+    書き込みのリクエストと、直前に書き込んだユーザーの読み取りをプライマリで処理する
+
+    レプリカの遅延で、更新前の投稿を読んで上書きしたり、
+    作成した投稿が一覧に表示されなかったりしないようにする。
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.primary_stack = ExitStack()
+        if request.method not in SAFE_METHODS or is_pinned(request.user):
+            self.primary_stack.enter_context(use_primary())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        stack = getattr(self, "primary_stack", None)
+        if stack is not None:
+            stack.close()
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReadSerializerListMixin:
+    """
+    一覧 (GET) はモデルのインスタンスを作らず、.values() の行を
+    PostReadSerializer で出力する
+
+    ?fields=id,title で出力するフィールドとSELECTするカラムを絞り込み、
+    ?excerpt=200 で content をDB側で先頭200文字に切り詰める。
+    """
 
+    fields_query_param = "fields"
+    excerpt_query_param = "excerpt"
+    max_excerpt_length = 1000
 
-class PostListView(generics.ListCreateAPIView):
-    queryset = Post.objects.all()
+    def list(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        excerpt_length = self.get_excerpt_length()
+        queryset = PostReadSerializer.get_values(
+            self.filter_queryset(self.get_queryset()),
+            fields,
+            excerpt_length,
+            # カーソルページネーションのキー
+            extra=("id", "published_at"),
+        )
+        serializer_kwargs = {"fields": fields, "excerpt": excerpt_length is not None}
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = PostReadSerializer(page, many=True, **serializer_kwargs)
+            return self.get_paginated_response(serializer.data)
+        serializer = PostReadSerializer(queryset, many=True, **serializer_kwargs)
+        return Response(serializer.data)
+
+    def get_fields(self):
+        value = self.request.query_params.get(self.fields_query_param)
+        if not value:
+            return None
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        if not names:
+            # ?fields=, や空白だけの場合は指定なしと同じにする
+            return None
+        unknown = sorted(names - set(PostReadSerializer.source_fields))
+        if unknown:
+            raise ValidationError(
+                {self.fields_query_param: [f"Unknown field: {', '.join(unknown)}"]}
+            )
+        # 出力の順序は PostSerializer と同じにする
+        return [name for name in PostReadSerializer.source_fields if name in names]
+
+    def get_excerpt_length(self):
+        value = self.request.query_params.get(self.excerpt_query_param)
+        if value is None:
+            return None
+        try:
+            length = int(value)
+        except ValueError:
+            length = 0
+        if not 0 < length <= self.max_excerpt_length:
+            raise ValidationError(
+                {
+                    self.excerpt_query_param: [
+                        f"Ensure this value is between 1 and {self.max_excerpt_length}."
+                    ]
+                }
+            )
+        return length
+
+
+class PostListView(
+    CachedResponseMixin,
+    ListConditionalGetMixin,
+    ReadSerializerListMixin,
+    ReadYourWritesMixin,
+    generics.ListCreateAPIView,
+):
+    cache_view_name = "post-list"
+    throttle_scope = "post-list"
+    queryset = Post.objects.for_api()
     serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
 
+    def get_queryset(self):
+        # 下書きは投稿者本人にのみ表示する
+        return super().get_queryset().visible_to(self.request.user)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Post.objects.all()
+class PostDetailView(
+    CachedResponseMixin,
+    DetailConditionalGetMixin,
+    ReadYourWritesMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
+    cache_view_name = "post-detail"
+    throttle_scope = "post-detail"
+    queryset = Post.objects.for_api()
     serializer_class = PostSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsOwnerOrReadOnly,
     )
+
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
+
+class PublishedFeedView(
+    CachedResponseMixin,
+    ListConditionalGetMixin,
+    ReadSerializerListMixin,
+    generics.ListAPIView,
+):
+    """
+    公開済みの投稿だけを published_at 順に返すフィード
+
+    post_published_feed_idx (is_published=True の部分インデックス) で取得する。
+    """
+
+    cache_view_name = "post-feed"
+    queryset = Post.objects.for_api().published()
+    serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
+
+
+class PostSearchView(
+    CachedResponseMixin, ReadSerializerListMixin, generics.ListAPIView
+):
+    """
+    タイトルと本文の全文検索 (?q=...)。関連度の高い順に返す
+    """
+
+    cache_view_name = "post-search"
+    throttle_scope = "post-search"
+    queryset = Post.objects.for_api()
+    serializer_class = PostSerializer
+    pagination_class = PostSearchPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "")
+        if not query.strip():
+            raise ValidationError({"q": ["This field is required."]})
+        return super().get_queryset().visible_to(self.request.user).search(query)
+
+
+class PostBulkView(ReadYourWritesMixin, generics.GenericAPIView):
+    """
+    投稿の一括作成 (POST)・一括更新 (PATCH)・一括削除 (DELETE)
+
+    正常な要素だけを1トランザクションでまとめて書き込み、不正な要素は
+    同じ位置の errors に理由を返す。
+    """
+
+    queryset = Post.objects.for_api()
+    serializer_class = PostSerializer
+    permission_classes = (
+        permissions.IsAuthenticated,
+        IsOwnerOrReadOnly,
+    )
+    max_batch_size = 1000
+
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of items."]})
+        if len(items) > self.max_batch_size:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure this list has no more than {self.max_batch_size} items."
+                    ]
+                }
+            )
+        return items
+
+    def get_instances(self, request, ids):
+        """
+        idごとに投稿を取得し、要素ごとに IsOwnerOrReadOnly を確認する
+        """
+        valid_ids = [
+            pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)
+        ]
+        posts = self.get_queryset().in_bulk(valid_ids)
+
+        instances, errors = [], []
+        for pk in ids:
+            post = posts.get(pk) if pk in valid_ids else None
+            if pk not in valid_ids:
+                error = {"id": ["A valid integer is required."]}
+            elif post is None:
+                error = {"detail": NotFound.default_detail}
+            elif not self.has_item_permission(request, post):
+                error = {"detail": PermissionDenied.default_detail}
+                post = None
+            else:
+                error = {}
+            instances.append(post)
+            errors.append(error)
+        return instances, errors
+
+    def has_item_permission(self, request, post):
+        return all(
+            permission.has_object_permission(request, self, post)
+            for permission in self.get_permissions()
+        )
+
+    def bulk_response(self, results, errors, success_status):
+        response_status = (
+            status.HTTP_207_MULTI_STATUS if any(errors) else success_status
+        )
+        return Response({"results": results, "errors": errors}, status=response_status)
+
+    def post(self, request, *args, **kwargs):
+        items = self.get_items(request)
+        serializer = self.get_serializer(data=items, many=True)
+        validated_data, errors = serializer.validate_items()
+
+        with transaction.atomic():
+            posts = serializer.create(
+                [
+                    {**attrs, "author": request.user}
+                    for attrs in validated_data
+                    if attrs is not None
+                ]
+            )
+            # bulk_create は post_save を送らないのでキャッシュを明示的に無効化する
+            transaction.on_commit(post_response_cache.bump_version)
+            stream.publish_changes(
+                [(post.pk, None, post.get_counter_state()) for post in posts]
+            )
+
+        created = iter(self.get_serializer(posts, many=True).data)
+        results = [
+            next(created) if attrs is not None else None for attrs in validated_data
+        ]
+        return self.bulk_response(results, errors, status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_items(request)
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        instances, errors = self.get_instances(request, ids)
+
+        found = [index for index, post in enumerate(instances) if post is not None]
+        serializer = self.get_serializer(
+            data=[items[index] for index in found], many=True, partial=True
+        )
+        validated_data, item_errors = serializer.validate_items(
+            [instances[index] for index in found]
+        )
+
+        updated = {}
+        for index, attrs, error in zip(found, validated_data, item_errors):
+            if attrs is None:
+                errors[index] = error
+            else:
+                updated[index] = attrs
+
+        targets = [instances[index] for index in updated]
+        old_states = [post._counter_state for post in targets]
+        with transaction.atomic():
+            serializer.update(targets, list(updated.values()))
+            transaction.on_commit(post_response_cache.bump_version)
+            stream.publish_changes(
+                [
+                    (post.pk, old_state, post._counter_state)
+                    for post, old_state in zip(targets, old_states)
+                ]
+            )
+
+        results = [
+            self.get_serializer(instances[index]).data if index in updated else None
+            for index in range(len(items))
+        ]
+        return self.bulk_response(results, errors, status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        ids = self.get_items(request)
+        instances, errors = self.get_instances(request, ids)
+        deleted = [post.pk for post in instances if post is not None]
+
+        with transaction.atomic():
+            Post.objects.filter(pk__in=deleted).delete()
+
+        results = [post.pk if post is not None else None for post in instances]
+        return self.bulk_response(results, errors, status.HTTP_200_OK)
+
+
+class PostExportView(APIView):
+    """
+    全投稿をNDJSONでストリーミング出力する (分析用)
+
+    ?since=<updated_at> で差分を、?compress=gzip でgzip圧縮したファイルを返す。
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                raise ValidationError({"since": ["Invalid datetime."]})
+
+        chunks = iter_ndjson(export_queryset(since), self.chunk_size)
+        if request.query_params.get("compress") == "gzip":
+            response = StreamingHttpResponse(
+                gzip_stream(chunks), content_type="application/gzip"
+            )
+            filename = "posts.ndjson.gz"
+        else:
+            response = StreamingHttpResponse(
+                chunks, content_type="application/x-ndjson"
+            )
+            filename = "posts.ndjson"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Cursor expired. Fetch all posts again."
+    default_code = "cursor_expired"
+
+
+class PostChangesView(generics.GenericAPIView):
+    """
+    ?cursor= 以降に作成・更新・削除された投稿を返す変更フィード
+
+    results の各要素は {"op": "upsert", "id", "post"} か {"op": "delete", "id"}。
+    返された cursor を次回のリクエストに渡せば、続きの変更だけを取得できる。
+    削除の記録が圧縮された古いカーソルには410を返す (全件を取得し直す)。
+    """
+
+    throttle_scope = "post-changes"
+    page_size = 100
+    max_page_size = 1000
+
+    def get(self, request, *args, **kwargs):
+        position = self.get_position(request)
+        limit = self.get_page_size(request)
+        results, position, has_more = changes.get_changes(request.user, position, limit)
+        cursor = changes.encode_cursor(position) if position is not None else None
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", cursor
+            )
+        return Response({"next": next_url, "cursor": cursor, "results": results})
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params["page_size"])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_position(self, request):
+        encoded = request.query_params.get("cursor")
+        if encoded is None:
+            return None
+        try:
+            position = changes.decode_cursor(encoded)
+        except ValueError:
+            raise NotFound("Invalid cursor")
+        if position[0] < changes.retention_horizon():
+            raise CursorExpired()
+        return position
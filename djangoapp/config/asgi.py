@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# ASGIではスレッドをまたいで接続を使い回せないため、永続接続を無効にして
+# 接続の再利用は外部のプーラー (PgBouncer) に任せる
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
+# 投稿のプッシュチャネル (/api/blog/async/posts/stream/) はSSEの接続を保持するため、
+# ASGIで起動した場合にのみ配信される
 application = get_asgi_application()
@@ -0,0 +1,185 @@
+"""
+レスポンスの圧縮 (brotli / gzip)
+
+Accept-Encoding で brotli (brotli がインストールされている場合) または gzip を選び、
+COMPRESSION_CONTENT_TYPES のレスポンスを圧縮する。ストリーミングのレスポンスは
+チャンクごとに圧縮して返す。Django の GZipMiddleware と同じく、
+圧縮したレスポンスのETagは弱いETagにする。
+
+レスポンスに compressed_callback が設定されていれば、圧縮したボディを渡して呼び出す
+(CachedResponseMixin がレスポンスキャッシュに圧縮済みのボディを保存するために使う)。
+"""
+
+import gzip
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+GZIP_LEVEL = 6
+# 動的な圧縮では速度と圧縮率のバランスが良い品質にする (11は遅すぎる)
+BROTLI_QUALITY = 5
+
+# settings.COMPRESSION_CONTENT_TYPES の既定値
+# text/html (管理画面やブラウザブルAPI) はCSRFトークンと入力値を同じボディに含むため、
+# 圧縮後の長さから秘密を推測される (BREACH) ので圧縮しない。
+# SSEの text/event-stream は配信が遅れるので含めない。
+DEFAULT_CONTENT_TYPES = [
+    "application/json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/csv",
+    "text/css",
+    "text/javascript",
+]
+
+_ACCEPT_ENCODING_RE = re.compile(r"^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def supported_encodings():
+    # 優先する順
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(request):
+    """
+    Accept-Encoding から使う圧縮方式を選ぶ (圧縮しない場合は None)
+    """
+    accepted = {}
+    for item in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        match = _ACCEPT_ENCODING_RE.match(item)
+        if match is None:
+            continue
+        try:
+            quality = float(match[2]) if match[2] is not None else 1.0
+        except ValueError:
+            continue
+        accepted[match[1].lower()] = quality
+    best = None
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.compress = self.compressor.process
+            self.flush = self.compressor.finish
+        else:
+            self.compressor = zlib.compressobj(
+                GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+            )
+            self.compress = self.compressor.compress
+            self.flush = self.compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def acompress_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def is_compressible(response):
+    if response.has_header("Content-Encoding"):
+        return False
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    allowed = getattr(settings, "COMPRESSION_CONTENT_TYPES", DEFAULT_CONTENT_TYPES)
+    return content_type in allowed
+
+
+def set_encoding_headers(response, encoding):
+    response["Content-Encoding"] = encoding
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        # 圧縮後のバイト列は元のボディと一致しないので弱いETagにする
+        response["ETag"] = "W/" + etag
+
+
+class CompressionMiddleware:
+    """
+    Accept-Encoding に応じてレスポンスを brotli / gzip で圧縮するミドルウェア
+
+    COMPRESSION_MIN_SIZE バイト未満のレスポンスは、圧縮しても小さくならないので
+    そのまま返す (ストリーミングは長さがわからないので常に圧縮する)。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        # 圧縮するかどうかでボディが変わるので、圧縮しない場合も Vary を付ける
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, encoding
+                )
+            del response["Content-Length"]
+        else:
+            min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+            if len(response.content) < min_size:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+            callback = getattr(response, "compressed_callback", None)
+            if callback is not None:
+                callback(encoding, compressed)
+        set_encoding_headers(response, encoding)
+        return response
@@ -0,0 +1,155 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger("django.db.replicas")
+
+_use_primary = ContextVar("use_primary", default=False)
+
+
+@contextmanager
+def use_primary():
+    """
+    このブロック内の読み取りをすべてプライマリに送る
+    """
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def _pin_key(user):
+    return f"db:pin-primary:{user.pk}"
+
+
+def pin_primary(user):
+    """
+    書き込んだユーザーの読み取りを REPLICA_PIN_SECONDS の間プライマリに固定する
+
+    レプリカへの反映が遅れても、自分の書き込みが一覧や詳細から消えないようにする
+    (read-your-writes)。全プロセスで共有するため BLOG_CACHE_ALIAS のキャッシュに記録する。
+    """
+    if not (user and user.is_authenticated):
+        return
+    timeout = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+    caches[settings.BLOG_CACHE_ALIAS].set(_pin_key(user), True, timeout=timeout)
+
+
+def is_pinned(user):
+    if not (user and user.is_authenticated):
+        return False
+    return bool(caches[settings.BLOG_CACHE_ALIAS].get(_pin_key(user)))
+
+
+class PrimaryReplicaRouter:
+    """
+    blog.Post と accounts.CustomUser (と変更フィード用の PostTombstone) の読み取りを
+    レプリカに、書き込みをプライマリに送るルーター
+
+    レプリカは settings.DATABASE_REPLICAS のエイリアスから無作為に選ぶ。
+    トランザクション中と use_primary() のブロック内はプライマリから読む。
+
+    ルーターはエイリアスを選ぶだけで接続しない (非同期ビューのイベントループから
+    呼ばれても同期のDBアクセスをしないため)。接続できるかどうかは
+    バックグラウンドのスレッドが REPLICA_CHECK_SECONDS ごとに専用の接続で確認し、
+    接続できなかったレプリカは次の確認まで使わない。
+    使えるレプリカが無ければプライマリから読む。
+    """
+
+    route_models = {"blog.Post", "blog.PostTombstone", "accounts.CustomUser"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._down = set()
+        self._checker = None
+
+    @property
+    def replicas(self):
+        return getattr(settings, "DATABASE_REPLICAS", [])
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label not in self.route_models:
+            return None
+        if _use_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self.get_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.label not in self.route_models:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # レプリカにはプライマリからのレプリケーションで反映される
+        if db in self.replicas:
+            return False
+        return None
+
+    def get_replica(self):
+        replicas = self.replicas
+        if not replicas:
+            return None
+        self.start_health_checks()
+        with self._lock:
+            healthy = [alias for alias in replicas if alias not in self._down]
+        return random.choice(healthy) if healthy else None
+
+    def start_health_checks(self):
+        with self._lock:
+            if self._checker is not None and self._checker.is_alive():
+                return
+            self._checker = threading.Thread(
+                target=self.run_health_checks, name="db-replica-checker", daemon=True
+            )
+            self._checker.start()
+
+    def run_health_checks(self):
+        while True:
+            self.check_replicas()
+            time.sleep(getattr(settings, "REPLICA_CHECK_SECONDS", 5))
+
+    def check_replicas(self):
+        """
+        各レプリカに専用の接続で接続し、使えるレプリカを更新する
+        """
+        for alias in list(self.replicas):
+            try:
+                # リクエストのスレッドの接続とは別の接続を使い、確認後に閉じる
+                connection = connections.create_connection(alias)
+                try:
+                    connection.ensure_connection()
+                finally:
+                    connection.close()
+            except Exception:
+                # 設定の誤りなども含めて、接続できないレプリカとして扱う
+                self.mark_down(alias)
+            else:
+                self.mark_up(alias)
+
+    def mark_down(self, alias):
+        with self._lock:
+            if alias in self._down:
+                return
+            self._down.add(alias)
+        logger.warning("Replica %s is unavailable", alias)
+
+    def mark_up(self, alias):
+        with self._lock:
+            if alias not in self._down:
+                return
+            self._down.discard(alias)
+        logger.info("Replica %s is available again", alias)
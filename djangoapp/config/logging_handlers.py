@@ -0,0 +1,47 @@
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    1行1件のJSONでログを出力するフォーマッター (ログ収集基盤向け)
+    """
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    ログをキューに積むだけで返し、実際の書き込みは別スレッドで行うハンドラー
+
+    リクエスト処理のスレッドがファイルへの書き込みで待たされないようにする。
+    handlers には "cfg://handlers.<name>" で他のハンドラーを指定する。
+    """
+
+    def __init__(self, handlers, respect_handler_level=True):
+        super().__init__(SimpleQueue())
+        # dictConfigのConvertingListは要素を取り出したときに cfg:// を解決する
+        handlers = [handlers[index] for index in range(len(handlers))]
+        self.listener = QueueListener(
+            self.queue, *handlers, respect_handler_level=respect_handler_level
+        )
+        self.listener.start()
+
+    def close(self):
+        # 終了時に logging.shutdown から呼ばれ、キューに残ったログを書き出してから止める
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+        super().close()
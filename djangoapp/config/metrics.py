@@ -0,0 +1,156 @@
+import bisect
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Prometheusのヒストグラムと同じ形式 (累積バケット・合計・件数) で値を集計する
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = defaultdict(lambda: [[0] * len(buckets), 0.0, 0])
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series[key]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {key: (list(c), s, n) for key, (c, s, n) in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(key + (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(key + (("le", "+Inf"),))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def histogram(self, name, documentation, buckets):
+        metric = Histogram(name, documentation, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """
+        公開時に呼び出され、Prometheus形式の行のリストを返す関数を登録する
+        """
+        self.collectors.append(collector)
+
+    def expose(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(items):
+    if not items:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in items
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def counter_lines(name, documentation, value):
+    return [
+        f"# HELP {name} {documentation}",
+        f"# TYPE {name} counter",
+        f"{name} {value}",
+    ]
+
+
+def gauge_lines(name, documentation, value):
+    return [
+        f"# HELP {name} {documentation}",
+        f"# TYPE {name} gauge",
+        f"{name} {value}",
+    ]
+
+
+registry = Registry()
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request wall time.", DURATION_BUCKETS
+)
+request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries.",
+    DURATION_BUCKETS,
+)
+request_db_queries = registry.histogram(
+    "http_request_db_queries", "Database queries per request.", QUERY_BUCKETS
+)
+# DRFのレンダラーでボディにエンコードする時間 (ビューが返した後)。
+# シリアライザーの to_representation はビューの中で実行されるので含まない。
+request_render_duration = registry.histogram(
+    "http_request_render_duration_seconds",
+    "Time spent encoding the response body in the renderer, "
+    "after the view (and its serializers) returned.",
+    DURATION_BUCKETS,
+)
+response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size.", SIZE_BUCKETS
+)
+
+
+def can_view_metrics(request):
+    """
+    METRICS_TOKEN の Bearer トークンか、スタッフのセッションなら True
+
+    リクエスト数やキャッシュのヒット率などは公開しない。
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    auth = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if token and len(auth) == 2 and auth[0].lower() == "bearer":
+        return constant_time_compare(auth[1], token)
+    user = getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    if not can_view_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.expose(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
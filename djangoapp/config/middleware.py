@@ -0,0 +1,99 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from config import metrics
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = None
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+class PerformanceMiddleware:
+    """
+    リクエストごとの処理時間・クエリ数・DB時間・レンダリング時間・レスポンスサイズを
+    Server-Timingヘッダーと /metrics (Prometheus形式) に出力するミドルウェア
+
+    レンダリング時間はDRFのレンダラーでボディにエンコードする時間で、
+    シリアライザーの時間はビューの中なので含まない (処理時間からDB時間と
+    レンダリング時間を引いた残りに含まれる)。
+    settings.PERF_METRICS_ENABLED をFalseにすると読み込まれない。
+    非同期ビューではORMが別スレッドの接続を使うため、DBの統計は記録しない。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_METRICS_ENABLED", True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        request.perf_stats = stats = RequestStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats.record_query))
+            response = self.get_response(request)
+        self.finish(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        request.perf_stats = stats = RequestStats()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.finish(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRFのResponseはこの後でレンダリングされるので、その時間を計る
+        stats = getattr(request, "perf_stats", None)
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time = time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, stats, duration):
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        labels = {"view": view, "method": request.method}
+
+        metrics.request_duration.observe(duration, **labels)
+        metrics.request_db_queries.observe(stats.queries, **labels)
+        metrics.request_db_duration.observe(stats.db_time, **labels)
+        timings = [
+            f"total;dur={duration * 1000:.1f}",
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+        ]
+        if stats.render_time is not None:
+            metrics.request_render_duration.observe(stats.render_time, **labels)
+            timings.append(f"render;dur={stats.render_time * 1000:.1f}")
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), **labels)
+        response["Server-Timing"] = ", ".join(timings)
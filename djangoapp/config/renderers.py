@@ -0,0 +1,87 @@
+"""
+orjson を使ったDRFのレンダラーとパーサー
+
+datetime はDRFの既定どおりシリアライザで TIME_ZONE の時刻の文字列
+("2024-01-01T09:00:00+09:00") にしてから渡す (APIの出力の形式を変えない)。
+文字列になっていない datetime / UUID は orjson がCで直接シリアライズする。
+orjson がインストールされていない環境では標準の json にフォールバックする。
+"""
+
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    # UTCの +00:00 は DRF の JSONEncoder と同じく Z で出力する
+    DUMPS_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+else:  # pragma: no cover
+    DUMPS_OPTIONS = 0
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # orjson が扱えない型 (Decimal, 遅延評価の文字列など) はDRFのエンコーダーに任せる
+    return _encoder.default(obj)
+
+
+def dumps(data):
+    """
+    data をUTF-8のJSONバイト列にする (DRFの JSONRenderer のコンパクト形式と同じ出力)
+    """
+    if orjson is None:
+        return JSONRenderer().render(data)
+    ret = orjson.dumps(data, default=_default, option=DUMPS_OPTIONS)
+    # JSONRenderer と同じく、JavaScriptで扱えない U+2028 / U+2029 をエスケープする
+    if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+        ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return ret
+
+
+def loads(data):
+    """
+    JSONのバイト列を読み込む (不正な場合は ValueError)
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # インデント付きやASCIIのみの出力は標準の JSONRenderer で行う
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
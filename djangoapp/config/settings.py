@@ -14,6 +14,10 @@ from pathlib import Path
 
 import environ
 
+from config.compression import (
+    DEFAULT_CONTENT_TYPES as DEFAULT_COMPRESSION_CONTENT_TYPES,
+)
+
 # 環境変数を読み込むためにenvironを設定
 env = environ.Env()
 
@@ -23,7 +27,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # .envファイルから環境変数を取り出す
 environ.Env.read_env(BASE_DIR / ".env")
 
-DEBUG = True
+# 本番ではDEBUGを無効にする (有効だとリクエストごとにSQLがメモリに記録される)
+DEBUG = env.bool("DEBUG", default=False)
 
 # SECRET_KEYがenvironにない場合
 # Djangoの例外ImproperlyConfigured を発生させる
@@ -47,6 +52,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # リクエスト全体の処理時間を計るため先頭に置く
+    "config.middleware.PerformanceMiddleware",
+    # 他のミドルウェアが変更した後のボディを圧縮するため、PerformanceMiddleware の次に置く
+    "config.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,6 +65,20 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# リクエストごとの性能計測 (Server-Timingヘッダーと /metrics)
+PERF_METRICS_ENABLED = env.bool("PERF_METRICS_ENABLED", default=True)
+# /metrics のBearerトークン (Prometheusの bearer_token)
+# 空ならスタッフのセッションだけが見られる
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# レスポンスの圧縮 (brotli がインストールされていれば brotli、それ以外は gzip)
+# これより小さいレスポンスは圧縮しない (ストリーミングは常に圧縮する)
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+# 圧縮するContent-Type (既定値は config.compression.DEFAULT_CONTENT_TYPES)
+COMPRESSION_CONTENT_TYPES = env.list(
+    "COMPRESSION_CONTENT_TYPES", default=DEFAULT_COMPRESSION_CONTENT_TYPES
+)
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -79,15 +102,137 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# DATABASE_URL で接続先を上書きできる (例: sqlite:///db.sqlite3)
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
-        "NAME": "postgres",
-        "USER": "postgres",
-        "PASSWORD": "postgres",
-        "HOST": "db_django_portfolio",
-        "PORT": "5432",
+    "default": env.db(
+        "DATABASE_URL",
+        default="postgres://postgres:postgres@db_django_portfolio:5432/postgres",
+    )
+}
+
+# 永続接続の設定
+# WSGIではワーカーのスレッドごとに1本の接続を保持して使い回すため、
+# 接続数の上限は「ワーカー数 x スレッド数」になる。PostgreSQLのmax_connections
+# (初期値100) を超えないようにワーカー数を決めること。
+# ASGIでは config/asgi.py で DB_CONN_MAX_AGE の初期値を0にしている。
+# 非同期ではリクエストごとに接続が作られるため、PgBouncerなどの外部プーラーを使う。
+# PgBouncerのトランザクションプーリングを使う場合は、
+# DB_DISABLE_SERVER_SIDE_CURSORS=True にする (iterator() のサーバーサイドカーソル対策)。
+DATABASES["default"].update(
+    {
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        "DISABLE_SERVER_SIDE_CURSORS": env.bool(
+            "DB_DISABLE_SERVER_SIDE_CURSORS", default=False
+        ),
+    }
+)
+
+# 読み取り専用のレプリカ (DATABASE_REPLICA_URLS にカンマ区切りで指定する)
+# blog.Post と accounts.CustomUser の読み取りを振り分ける (config/db_router.py)。
+# テストではプライマリと同じDBを参照する (TEST.MIRROR)。
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), start=1):
+    alias = f"replica{index}"
+    DATABASES[alias] = {
+        **env.db_url_config(url),
+        "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],
+        "CONN_HEALTH_CHECKS": DATABASES["default"]["CONN_HEALTH_CHECKS"],
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+# 書き込んだユーザーの読み取りをプライマリに固定する秒数 (レプリケーション遅延より長くする)
+REPLICA_PIN_SECONDS = env.int("DB_REPLICA_PIN_SECONDS", default=5)
+# レプリカに接続できるかを確認する間隔 (接続できなかったレプリカは次の確認まで使わない)
+REPLICA_CHECK_SECONDS = env.int("DB_REPLICA_CHECK_SECONDS", default=5)
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# 本番では CACHE_URL=redis://... を指定する
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    # スロットルのカウンター (全プロセスで共有するため本番ではRedisなどを指定する)
+    "throttle": env.cache("THROTTLE_CACHE_URL", default="locmemcache://throttle"),
+}
+
+# 投稿一覧・詳細のレスポンスキャッシュ
+BLOG_CACHE_ALIAS = "default"
+BLOG_CACHE_TIMEOUT = env.int("BLOG_CACHE_TIMEOUT", default=60)
+
+THROTTLE_CACHE_ALIAS = "throttle"
+
+# APIトークン (/api-auth/token/) の有効期限
+TOKEN_TTL_SECONDS = env.int("TOKEN_TTL_SECONDS", default=3600)
+# 最初の発行からこの秒数を過ぎたトークンは更新できない (再ログインが必要)
+TOKEN_MAX_LIFETIME_SECONDS = env.int(
+    "TOKEN_MAX_LIFETIME_SECONDS", default=7 * 24 * 3600
+)
+# トークンのユーザーをプロセス内にキャッシュする秒数
+# (他のプロセスでトークンの無効化が反映されるまでの最大の秒数)
+TOKEN_USER_CACHE_SECONDS = env.int("TOKEN_USER_CACHE_SECONDS", default=15)
+
+# 投稿の変更フィード (/api/blog/posts/changes/)
+# 実行中のトランザクションの変更を取りこぼさないよう、この秒数より新しい変更は返さない
+CHANGE_FEED_SETTLE_SECONDS = env.int("CHANGE_FEED_SETTLE_SECONDS", default=2)
+# 削除の記録を残す日数 (compact_tombstones の既定値。これより古いカーソルは410)
+CHANGE_FEED_RETENTION_DAYS = env.int("CHANGE_FEED_RETENTION_DAYS", default=30)
+
+# 投稿のプッシュチャネル (/api/blog/async/posts/stream/)
+# 複数のプロセス・ノードで運用する場合は blog.stream.PostgresNotifyBroker を指定する
+BLOG_STREAM_BROKER = env("BLOG_STREAM_BROKER", default="blog.stream.InProcessBroker")
+# 購読者ごとの未送信イベントの上限 (超えた購読者は reset を送って切断する)
+BLOG_STREAM_QUEUE_SIZE = env.int("BLOG_STREAM_QUEUE_SIZE", default=100)
+# 1プロセスあたりの同時接続数の上限 (超えると503)
+BLOG_STREAM_MAX_SUBSCRIBERS = env.int("BLOG_STREAM_MAX_SUBSCRIBERS", default=1000)
+BLOG_STREAM_KEEPALIVE_SECONDS = env.int("BLOG_STREAM_KEEPALIVE_SECONDS", default=15)
+# 1回の接続を保持する秒数 (クライアントは自動的に再接続する)
+BLOG_STREAM_MAX_SECONDS = env.int("BLOG_STREAM_MAX_SECONDS", default=300)
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # セッションのないクライアントは Authorization: Bearer <token> で認証する
+    # (未認証時の応答を403のままにするため SessionAuthentication を先頭に置く)
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "accounts.authentication.SignedTokenAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "config.throttling.AnonRateThrottle",
+        "config.throttling.UserRateThrottle",
+        "config.throttling.ScopedRateThrottle",
+        "config.throttling.WriteRateThrottle",
+    ],
+    # 手前のリバースプロキシの段数。未認証のスロットルは X-Forwarded-For の
+    # 右からこの数番目のアドレスで数える (0ならREMOTE_ADDR。クライアントが
+    # 送った X-Forwarded-For は信用しない)
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
+    "DEFAULT_THROTTLE_RATES": {
+        # 未認証はIPアドレスごと、認証済みはユーザーごと
+        "anon": env("THROTTLE_ANON_RATE", default="120/min"),
+        "user": env("THROTTLE_USER_RATE", default="600/min"),
+        # 作成・更新・削除
+        "write": env("THROTTLE_WRITE_RATE", default="30/min"),
+        # エンドポイントごと (ビューの throttle_scope)
+        "post-list": env("THROTTLE_POST_LIST_RATE", default="300/min"),
+        "post-detail": env("THROTTLE_POST_DETAIL_RATE", default="300/min"),
+        "post-search": env("THROTTLE_POST_SEARCH_RATE", default="60/min"),
+        "post-changes": env("THROTTLE_POST_CHANGES_RATE", default="120/min"),
+        # トークンの発行・更新 (パスワードの総当たりを防ぐ)
+        "auth-token": env("THROTTLE_AUTH_TOKEN_RATE", default="10/min"),
+    },
 }
 
 # Password validation
@@ -135,17 +280,26 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 log_dir = BASE_DIR / "log"
 log_dir.mkdir(parents=True, exist_ok=True)
 
+# ログの出力レベルと形式 (verbose / json) は環境変数で切り替える
+LOG_LEVEL = env("LOG_LEVEL", default="DEBUG" if DEBUG else "INFO")
+LOG_FORMAT = env("LOG_FORMAT", default="verbose" if DEBUG else "json")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {
         "file": {
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "class": "logging.handlers.RotatingFileHandler",
             "filename": log_dir / "debug.log",
             "maxBytes": 1024 * 1024 * 5,  # 5MB
             "backupCount": 3,  # バックアップファイルの個数
-            "formatter": "verbose",
+            "formatter": LOG_FORMAT,
+        },
+        # ファイルへの書き込みを別スレッドで行う
+        "queue": {
+            "()": "config.logging_handlers.QueueListenerHandler",
+            "handlers": ["cfg://handlers.file"],
         },
     },
     "formatters": {
@@ -153,11 +307,14 @@ LOGGING = {
             "format": "{levelname} {asctime} {module} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "config.logging_handlers.JsonFormatter",
+        },
     },
     "loggers": {
         "django": {
-            "handlers": ["file"],
-            "level": "DEBUG",
+            "handlers": ["queue"],
+            "level": LOG_LEVEL,
             "propagate": True,
         },
     },
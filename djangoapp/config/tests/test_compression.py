@@ -0,0 +1,120 @@
+import gzip
+
+import pytest
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog.cache import post_response_cache
+from blog.models import Post
+from config import compression
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("*", "preferred"),
+        ("br, gzip", "preferred"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("deflate, GZIP;q=0.8", "gzip"),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    """Accept-Encoding のq値に従って圧縮方式を選ぶことを確認"""
+    if expected == "preferred":
+        expected = compression.supported_encodings()[0]
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert compression.negotiate(request) == expected
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    def setup_method(self):
+        post_response_cache.cache.clear()
+        self.client = Client(HTTP_ACCEPT_ENCODING="gzip")
+        self.url = reverse("post-list")
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password", is_staff=True
+        )
+        for i in range(5):
+            Post.objects.create(
+                title=f"Post {i}",
+                content="Content " * 100,
+                author=self.user,
+                is_published=True,
+            )
+
+    def test_compresses_json(self):
+        """閾値より大きいJSONをgzipで圧縮し、ETagを弱いETagにすることを確認"""
+        plain = Client().get(self.url)
+        response = self.client.get(self.url)
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert response["ETag"] == "W/" + plain["ETag"]
+        assert gzip.decompress(response.content) == plain.content
+        assert int(response["Content-Length"]) == len(response.content)
+
+    @override_settings(COMPRESSION_MIN_SIZE=10**6)
+    def test_small_response_not_compressed(self):
+        response = self.client.get(self.url)
+
+        assert not response.has_header("Content-Encoding")
+        assert "Accept-Encoding" in response["Vary"]
+
+    @override_settings(COMPRESSION_CONTENT_TYPES=["text/plain"])
+    def test_content_type_allowlist(self):
+        response = self.client.get(self.url)
+
+        assert not response.has_header("Content-Encoding")
+
+    def test_html_not_compressed(self):
+        """CSRFトークンを含むHTML (ブラウザブルAPI) は圧縮しないことを確認 (BREACH対策)"""
+        response = self.client.get(self.url, HTTP_ACCEPT="text/html")
+
+        assert response["Content-Type"].startswith("text/html")
+        assert not response.has_header("Content-Encoding")
+
+    def test_compresses_streaming_response(self):
+        """ストリーミングのレスポンスもチャンクごとに圧縮することを確認"""
+        self.client.force_login(self.user)
+        plain = Client()
+        plain.force_login(self.user)
+        url = reverse("post-export")
+
+        response = self.client.get(url)
+
+        assert response["Content-Encoding"] == "gzip"
+        assert not response.has_header("Content-Length")
+        body = gzip.decompress(b"".join(response.streaming_content))
+        assert body == b"".join(plain.get(url).streaming_content)
+
+    def test_cached_response_served_precompressed(self, monkeypatch):
+        """キャッシュが有効な間は圧縮済みのボディを返し、圧縮し直さないことを確認"""
+        calls = []
+        compress = compression.compress
+        monkeypatch.setattr(
+            compression,
+            "compress",
+            lambda data, encoding: calls.append(encoding) or compress(data, encoding),
+        )
+
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        assert calls == ["gzip"]
+        assert first["X-Cache"] == "MISS"
+        assert second["X-Cache"] == "HIT"
+        assert second["Content-Encoding"] == "gzip"
+        assert second["ETag"] == first["ETag"]
+        assert "Accept-Encoding" in second["Vary"]
+        assert second.content == first.content
+
+        plain = Client().get(self.url)
+        assert not plain.has_header("Content-Encoding")
+        assert plain["X-Cache"] == "HIT"
@@ -0,0 +1,167 @@
+from contextlib import suppress
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, router, transaction
+from django.test import Client
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from blog.models import Post
+from config.db_router import PrimaryReplicaRouter, is_pinned
+
+
+@pytest.fixture
+def replica_router(settings, tmp_path):
+    """
+    プライマリと同じDBを参照する replica と、接続できない broken の
+    2つのSQLiteのエイリアスを追加する
+
+    トランザクション中の読み取りはプライマリに送られるため、
+    このフィクスチャを使うテストは transaction=True にする。
+    """
+    configured = connections.configure_settings(
+        {
+            "default": connections.settings["default"],
+            "replica": dict(connections.settings["default"]),
+            "broken": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(tmp_path / "missing" / "db.sqlite3"),
+            },
+        }
+    )
+    connections.settings.update(
+        replica=configured["replica"], broken=configured["broken"]
+    )
+    connections["replica"] = connections["default"]
+    settings.DATABASE_REPLICAS = ["replica"]
+    (instance,) = [r for r in router.routers if isinstance(r, PrimaryReplicaRouter)]
+    # バックグラウンドの確認は行わず、テストから check_replicas を呼ぶ
+    instance.start_health_checks = lambda: None
+    instance._down.clear()
+    yield instance
+    del instance.start_health_checks
+    instance._down.clear()
+    for alias in ("replica", "broken"):
+        with suppress(AttributeError):
+            del connections[alias]
+        del connections.settings[alias]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPrimaryReplicaRouter:
+    def test_reads_go_to_replica_and_writes_to_primary(self, replica_router):
+        assert Post.objects.all().db == "replica"
+        assert CustomUser.objects.all().db == "replica"
+        assert router.db_for_write(Post) == "default"
+        # 対象外のモデルはプライマリのまま
+        assert ContentType.objects.all().db == "default"
+
+    def test_reads_in_transaction_go_to_primary(self, replica_router):
+        with transaction.atomic():
+            assert Post.objects.all().db == "default"
+
+    def test_unhealthy_replica_falls_back(self, replica_router, settings):
+        """接続できないレプリカを使わず、他のレプリカかプライマリから読むことを確認"""
+        settings.DATABASE_REPLICAS = ["broken", "replica"]
+        replica_router.check_replicas()
+        assert replica_router._down == {"broken"}
+        assert {Post.objects.all().db for _ in range(10)} == {"replica"}
+
+        settings.DATABASE_REPLICAS = ["broken"]
+        assert Post.objects.all().db == "default"
+
+    def test_async_views_with_replicas(self, replica_router):
+        """ルーターが接続しないので、非同期ビューもレプリカから読めることを確認"""
+        user = CustomUser.objects.create_user(username="testuser", password="password")
+        post = Post.objects.create(
+            title="Post", content="Content", author=user, is_published=True
+        )
+        client = Client()
+
+        response = client.get(reverse("async-post-list"))
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.json()["results"]] == [post.pk]
+
+        response = client.get(reverse("async-post-detail", args=[post.pk]))
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_replicas_are_not_migrated(self, replica_router):
+        assert router.allow_migrate("replica", "blog") is False
+        assert router.allow_migrate("default", "blog") is True
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReadYourWrites:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+        self.other = CustomUser.objects.create_user(
+            username="other", password="password"
+        )
+
+    def spy_reads(self, monkeypatch, replica_router):
+        """Postを読んだDBのエイリアスを記録するリストを返す"""
+        databases = []
+        db_for_read = replica_router.db_for_read
+
+        def spy(model, **hints):
+            alias = db_for_read(model, **hints)
+            if model is Post:
+                databases.append(alias)
+            return alias
+
+        monkeypatch.setattr(replica_router, "db_for_read", spy)
+        return databases
+
+    def read_databases(self, monkeypatch, replica_router, user):
+        """user として一覧を取得し、Postを読んだDBのエイリアスを返す"""
+        with monkeypatch.context() as patch:
+            databases = self.spy_reads(patch, replica_router)
+            self.client.force_authenticate(user=user)
+            response = self.client.get(reverse("post-list"))
+        assert response.status_code == status.HTTP_200_OK
+        return set(databases)
+
+    def test_writer_reads_from_primary(self, monkeypatch, replica_router):
+        """作成したユーザーの直後の読み取りだけがプライマリに送られることを確認"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("post-list"), {"title": "Post", "content": "Content"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert is_pinned(self.user)
+        assert not is_pinned(self.other)
+
+        assert self.read_databases(monkeypatch, replica_router, self.user) == {
+            "default"
+        }
+        assert self.read_databases(monkeypatch, replica_router, self.other) == {
+            "replica"
+        }
+
+    def test_cache_miss_reads_from_primary(self, monkeypatch, replica_router):
+        """キャッシュに保存するレスポンスはレプリカから読まないことを確認"""
+        databases = self.spy_reads(monkeypatch, replica_router)
+        response = self.client.get(reverse("post-list"))
+        assert response["X-Cache"] == "MISS"
+        assert databases
+        assert set(databases) == {"default"}
+
+    def test_update_reads_object_from_primary(self, monkeypatch, replica_router):
+        """更新対象の投稿をレプリカから読まないことを確認"""
+        post = Post.objects.create(title="Post", content="Content", author=self.user)
+        databases = self.spy_reads(monkeypatch, replica_router)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.put(
+            reverse("post-detail", kwargs={"pk": post.pk}),
+            {"title": "Updated", "content": "Content"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert databases
+        assert set(databases) == {"default"}
+        assert is_pinned(self.user)
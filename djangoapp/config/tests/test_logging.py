@@ -0,0 +1,39 @@
+import json
+import logging
+
+from config.logging_handlers import JsonFormatter, QueueListenerHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_json_formatter():
+    """ログが1行のJSONとして出力されることを確認"""
+    record = logging.LogRecord(
+        "django", logging.INFO, __file__, 1, "日本語 %s", ("ok",), None
+    )
+    data = json.loads(JsonFormatter().format(record))
+    assert data["level"] == "INFO"
+    assert data["logger"] == "django"
+    assert data["message"] == "日本語 ok"
+
+
+def test_queue_listener_handler_forwards_records():
+    """キューに積まれたログが別スレッドで転送先のハンドラーに渡ることを確認"""
+    target = ListHandler()
+    handler = QueueListenerHandler([target])
+    logger = logging.getLogger("test_queue_listener_handler")
+    logger.addHandler(handler)
+    try:
+        logger.warning("queued")
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert [record.getMessage() for record in target.records] == ["queued"]
@@ -0,0 +1,63 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog.models import Post
+
+
+@pytest.mark.django_db
+class TestPerformanceMiddleware:
+    def setup_method(self):
+        self.client = Client()
+        user = CustomUser.objects.create_user(username="testuser", password="password")
+        self.staff = CustomUser.objects.create_user(
+            username="staff", password="password", is_staff=True
+        )
+        Post.objects.create(
+            title="Test Post", content="Content", author=user, is_published=True
+        )
+
+    def test_server_timing_header(self):
+        """Server-Timingに処理時間・DB時間・レンダリング時間が含まれることを確認"""
+        response = self.client.get(reverse("post-list"))
+        timing = response["Server-Timing"]
+        assert timing.startswith("total;dur=")
+        assert 'desc="2 queries"' in timing
+        assert "render;dur=" in timing
+
+    def test_metrics_endpoint(self):
+        """URL名ごとのヒストグラムがPrometheus形式で出力されることを確認"""
+        self.client.get(reverse("post-list"))
+        self.client.get(reverse("post-list"))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("metrics"))
+
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert (
+            'http_request_duration_seconds_bucket{method="GET",view="post-list",le="+Inf"}'
+            in body
+        )
+        assert 'http_response_size_bytes_count{method="GET",view="post-list"}' in body
+        assert "blog_post_cache_hits_total" in body
+
+    def test_metrics_requires_token_or_staff(self, settings):
+        """/metrics は METRICS_TOKEN かスタッフのセッションでしか見られないことを確認"""
+        settings.METRICS_TOKEN = "secret"
+        url = reverse("metrics")
+        assert self.client.get(url).status_code == 403
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong")
+        assert response.status_code == 403
+
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        assert response.status_code == 200
+
+        self.client.force_login(CustomUser.objects.get(username="testuser"))
+        assert self.client.get(url).status_code == 403
+
+    def test_middleware_can_be_disabled(self, settings):
+        settings.PERF_METRICS_ENABLED = False
+        response = self.client.get(reverse("post-list"))
+        assert not response.has_header("Server-Timing")
@@ -0,0 +1,53 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from config import renderers
+from config.renderers import ORJSONParser, ORJSONRenderer
+
+DATA = {
+    "title": "日本語のタイトル\u2028",
+    "published_at": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    "price": Decimal("1.50"),
+    "tags": ["a", "b"],
+}
+
+
+def test_renderer_matches_json_renderer():
+    """datetime などを含むデータで DRF の JSONRenderer と同じバイト列になることを確認"""
+    assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+def test_renderer_formats_datetime_without_isoformat():
+    body = ORJSONRenderer().render(DATA)
+    assert json.loads(body)["published_at"] == "2024-01-02T03:04:05.678901Z"
+
+
+def test_renderer_indent_falls_back_to_json_renderer():
+    body = ORJSONRenderer().render(DATA, "application/json; indent=4")
+    assert body == JSONRenderer().render(DATA, "application/json; indent=4")
+
+
+def test_renderer_without_orjson(monkeypatch):
+    """orjson が無い環境では標準の json で同じ出力になることを確認"""
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+    assert renderers.loads(b'{"a": 1}') == {"a": 1}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_parser(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(renderers, "orjson", None)
+    stream = io.BytesIO('{"title": "日本語"}'.encode("utf-8"))
+    assert ORJSONParser().parse(stream) == {"title": "日本語"}
+
+
+def test_parser_error():
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(b'{"title": '))
@@ -0,0 +1,158 @@
+import pytest
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import CustomUser
+from config.throttling import AnonRateThrottle, SlidingWindowRateThrottle
+
+
+def throttle_rates(**rates):
+    return override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+                **rates,
+            },
+        }
+    )
+
+
+class FakeTimer:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="password"
+        )
+
+    @throttle_rates(anon="2/min")
+    def test_anonymous_requests_are_limited_per_ip(self, monkeypatch):
+        """上限を超えると429とRetry-Afterヘッダーを返すことを確認"""
+        # ウィンドウの途中 (経過0.5) に固定して、待ち時間を決まった値にする
+        monkeypatch.setattr(SlidingWindowRateThrottle, "timer", FakeTimer(630.0))
+        url = reverse("post-list")
+        for _ in range(2):
+            assert self.client.get(url).status_code == status.HTTP_200_OK
+
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response["Retry-After"] == "60"
+
+        # 別のIPアドレスは制限されない
+        response = self.client.get(url, REMOTE_ADDR="192.0.2.1")
+        assert response.status_code == status.HTTP_200_OK
+
+    @throttle_rates(anon="1/min")
+    def test_forwarded_for_is_not_trusted_without_proxies(self):
+        """プロキシが無ければ、X-Forwarded-For を変えても制限を回避できないことを確認"""
+        url = reverse("post-list")
+        response = self.client.get(url, HTTP_X_FORWARDED_FOR="198.51.100.1")
+        assert response.status_code == status.HTTP_200_OK
+
+        response = self.client.get(url, HTTP_X_FORWARDED_FOR="198.51.100.2")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    @throttle_rates(anon="2/min")
+    def test_authenticated_user_uses_user_rate(self):
+        self.client.force_authenticate(user=self.user)
+        for _ in range(3):
+            response = self.client.get(reverse("post-list"))
+            assert response.status_code == status.HTTP_200_OK
+
+    @throttle_rates(**{"post-search": "1/min"})
+    def test_endpoint_scope(self):
+        """throttle_scope ごとに別の上限が適用されることを確認"""
+        url = reverse("post-search")
+        assert self.client.get(url, {"q": "a"}).status_code == status.HTTP_200_OK
+        response = self.client.get(url, {"q": "b"})
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert self.client.get(reverse("post-list")).status_code == status.HTTP_200_OK
+
+    @throttle_rates(write="1/min")
+    def test_writes_have_tighter_budget(self):
+        """作成は write の上限で制限され、読み取りは制限されないことを確認"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("post-list")
+        data = {"title": "Post", "content": "Content"}
+        assert self.client.post(url, data).status_code == status.HTTP_201_CREATED
+
+        response = self.client.post(url, data)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Retry-After" in response
+        assert self.client.get(url).status_code == status.HTTP_200_OK
+
+    @throttle_rates(anon="2/min")
+    def test_async_views_are_limited(self):
+        """非同期ビューにも同じスロットルが適用されることを確認"""
+        client = Client()
+        url = reverse("async-post-list")
+        for _ in range(2):
+            assert client.get(url).status_code == status.HTTP_200_OK
+
+        response = client.get(url)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Retry-After" in response
+
+    @throttle_rates(**{"post-list": "1/min"})
+    def test_async_view_shares_scope_with_sync_view(self):
+        """同期版と非同期版は同じ throttle_scope の上限を共有することを確認"""
+        assert self.client.get(reverse("post-list")).status_code == status.HTTP_200_OK
+
+        response = Client().get(reverse("async-post-list"))
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@throttle_rates(anon="10/min")
+def test_sliding_window_counts_previous_window():
+    """直前のウィンドウの回数が経過時間に応じて按分されることを確認"""
+    request = APIRequestFactory().get("/")
+    request.user = None
+    timer = FakeTimer(600.0)
+
+    def allow():
+        throttle = AnonRateThrottle()
+        throttle.timer = timer
+        allowed = throttle.allow_request(request, None)
+        return allowed, None if allowed else throttle.wait()
+
+    assert all(allow()[0] for _ in range(10))
+    assert allow() == (False, 60.0 + 6.0)
+
+    # 次のウィンドウの半分: 直前の10回 x 0.5 = 5回分が残る
+    timer.now = 690.0
+    assert all(allow()[0] for _ in range(5))
+    allowed, wait = allow()
+    assert not allowed
+    assert wait == pytest.approx(6.0)
+
+    # 直前のウィンドウの重みが下がれば再び許可される
+    timer.now = 696.0
+    assert allow()[0]
+
+
+@throttle_rates(anon="1/min")
+def test_rejected_request_survives_evicted_counter(monkeypatch):
+    """拒否の直前にカウンターが追い出されても500にならないことを確認"""
+    request = APIRequestFactory().get("/")
+    request.user = None
+    throttle = AnonRateThrottle()
+    throttle.timer = FakeTimer(630.0)
+    assert throttle.allow_request(request, None)
+
+    def decr(key, delta=1, version=None):
+        raise ValueError(f"Key '{key}' not found")
+
+    monkeypatch.setattr(throttle.cache, "decr", decr)
+    assert not throttle.allow_request(request, None)
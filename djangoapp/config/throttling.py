@@ -0,0 +1,155 @@
+"""
+スライディングウィンドウ方式のDRFスロットル
+
+DRF標準の SimpleRateThrottle はリクエスト時刻のリストを get / set で
+読み書きするため、複数のプロセスから同時にアクセスされると回数を取りこぼす。
+こちらは固定ウィンドウごとのカウンターを cache.incr で原子的に増やし、
+直前のウィンドウの回数を経過時間で按分して足し合わせる
+(スライディングウィンドウカウンター)。
+
+カウンターは settings.THROTTLE_CACHE_ALIAS のキャッシュに保存する
+(テストはlocmem、本番はRedisなどプロセス間で共有されるキャッシュ)。
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "THROTTLE_CACHE_ALIAS", "default")]
+
+    @property
+    def THROTTLE_RATES(self):
+        # override_settings で変更できるよう、クラス定義時ではなく参照時に読む
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window, elapsed = divmod(now, self.duration)
+        elapsed /= self.duration
+        current_key = f"{self.key}:{int(window)}"
+
+        count = self.increment(current_key)
+        previous = self.cache.get(f"{self.key}:{int(window) - 1}", 0)
+        if previous * (1 - elapsed) + count <= self.num_requests:
+            return True
+
+        # 拒否したリクエストは回数に含めない
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            # incr と decr の間に期限切れになった (追い出された) 場合
+            pass
+        self.wait_seconds = self.get_wait(previous, count - 1, elapsed)
+        return False
+
+    def increment(self, key):
+        # add は既存のキーを上書きしないので、incr と合わせて原子的に数えられる
+        timeout = self.duration * 2
+        self.cache.add(key, 0, timeout=timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # add と incr の間に期限切れになった場合
+            self.cache.set(key, 1, timeout=timeout)
+            return 1
+
+    def get_wait(self, previous, count, elapsed):
+        """
+        次のリクエストが許可されるまでの秒数
+        """
+        allowed = self.num_requests - 1
+        if count <= allowed:
+            # 直前のウィンドウの重みが十分に下がるまで待つ
+            needed = 1 - (allowed - count) / previous
+            return max(needed - elapsed, 0) * self.duration
+        # 現在のウィンドウが直前のウィンドウになり、その重みが下がるまで待つ
+        needed = 1 - allowed / count
+        return (1 - elapsed + needed) * self.duration
+
+    def wait(self):
+        return self.wait_seconds
+
+    def get_ident_key(self, request):
+        # 認証済みならユーザーごと、未認証ならIPアドレスごとに数える
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class AnonRateThrottle(SlidingWindowRateThrottle):
+    """
+    未認証のリクエストをIPアドレスごとに制限する
+    """
+
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident_key(request)
+
+
+class UserRateThrottle(SlidingWindowRateThrottle):
+    """
+    認証済みのリクエストをユーザーごとに制限する
+    """
+
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.get_ident_key(request)
+
+
+class ScopedRateThrottle(SlidingWindowRateThrottle):
+    """
+    ビューの throttle_scope ごとに、ユーザーまたはIPアドレス単位で制限する
+    """
+
+    scope_attr = "throttle_scope"
+
+    def __init__(self):
+        # スコープはビューが決まるまでわからないので、レートは allow_request で読む
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        return self.get_ident_key(request)
+
+
+class WriteRateThrottle(SlidingWindowRateThrottle):
+    """
+    作成・更新・削除 (GET/HEAD/OPTIONS 以外) を読み取りより厳しく制限する
+    """
+
+    scope = "write"
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        return self.get_ident_key(request)
@@ -15,12 +15,22 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
+from accounts.views import TokenObtainView, TokenRefreshView, TokenRevokeView
+from config.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/accounts/", include("accounts.urls")),
     path("api/blog/", include("blog.urls")),
+    path("api-auth/token/", TokenObtainView.as_view(), name="token-obtain"),
+    path("api-auth/token/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
+    path("api-auth/token/revoke/", TokenRevokeView.as_view(), name="token-revoke"),
     path("api-auth", include("rest_framework.urls")),
 ]
+
+if settings.PERF_METRICS_ENABLED:
+    urlpatterns.append(path("metrics", metrics_view, name="metrics"))